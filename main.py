@@ -1,20 +1,13 @@
 import argparse
 
-from pynes.cassette import *
-from pynes.cpu import *
-from pynes.interrupts import *
-from pynes.ppu import *
-from pynes.ram import *
+from pynes.movie import *
+from pynes.nes import *
 from pynes.renderer import *
 from pynes.video import *
 
 def nestest():
-    cas = Cassette("rom/nestest.nes")
-    wram = Ram(WRAM_SIZE)
-    vram = Ram(VRAM_SIZE)
-    inter = Interrupts()
-    ppu = Ppu(cas, vram, inter)
-    cpu = Cpu(cas, wram, ppu, inter)
+    nes = Nes("rom/nestest.nes")
+    cpu = nes.cpu
     # cpu.reset_addr(0xc000)
     cpu.load_correct_log(f"test_log/nestest.yaml")
     pprint(vars(cpu.reg))
@@ -22,25 +15,19 @@ def nestest():
     renderer = Renderer()
     video = Video(cpu)
 
-    # for _ in range(8991):
     while True:
-        cycle = cpu.run()
-        if not (image := ppu.run(cycle)) == None:
-            s = time.time()
-            renderer.render(image)
-            data = renderer.get_render_result()
-            video.update(data)
-            e = time.time()
-            print(f"[FPS] {1/(e - s):0.1f}")
+        image = nes.run_frame()
+        s = time.time()
+        renderer.render(image)
+        data = renderer.get_render_result()
+        video.update(data)
+        e = time.time()
+        print(f"[FPS] {1/(e - s):0.1f}")
     print("success!")
 
 def hello():
-    cas = Cassette("rom/hello.nes")
-    wram = Ram(WRAM_SIZE)
-    vram = Ram(VRAM_SIZE)
-    inter = Interrupts()
-    ppu = Ppu(cas, vram, inter)
-    cpu = Cpu(cas, wram, ppu, inter)
+    nes = Nes("rom/hello.nes")
+    cpu = nes.cpu
     cpu.load_correct_log("log/hello.yaml")
     pprint(vars(cpu.reg))
 
@@ -48,48 +35,64 @@ def hello():
     video = Video(cpu)
 
     while True:
-        cycle = cpu.run()
-        if not (image := ppu.run(cycle)) == None:
-            s = time.time()
-            renderer.render(image)
-            data = renderer.get_render_result()
-            video.update(data)
-            e = time.time()
-            print(f"[FPS] {1/(e - s):0.1f}")
+        image = nes.run_frame()
+        s = time.time()
+        renderer.render(image)
+        data = renderer.get_render_result()
+        video.update(data)
+        e = time.time()
+        print(f"[FPS] {1/(e - s):0.1f}")
     print("success!")
 
 def run(args):
-    cas = Cassette(f"rom/{args.rom}")
-    wram = Ram(WRAM_SIZE)
-    vram = Ram(VRAM_SIZE)
-    inter = Interrupts()
-    ppu = Ppu(cas, vram, inter)
-    cpu = Cpu(cas, wram, ppu, inter)
+    nes = Nes(f"rom/{args.rom}")
+    cpu = nes.cpu
+    cpu.set_trace(TraceMode[args.trace.upper()], path = args.trace_path)
+    cpu.set_block_cache(args.block_cache)
     pprint(vars(cpu.reg))
 
     renderer = Renderer()
-    video = Video(cpu)
+    video = create_video(args.video, cpu, args.scale, args.out)
 
+    # pad input from a movie, or recorded to a movie
+    machine = nes
     loop = sys.maxsize if args.loop == -1 else args.loop
+    if args.play:
+        machine = MoviePlayer(nes, Movie.load(args.play))
+        loop = len(machine.movie) if args.loop == -1 else args.loop
+    elif args.record:
+        machine = MovieRecorder(nes)
+
     for _ in range(loop):
-        cycle = cpu.run()
-        if not (image := ppu.run(cycle)) == None:
-            s = time.time()
-            renderer.render(image)
-            data = renderer.get_render_result()
-            video.update(data)
-            e = time.time()
-            print(f"[FPS] {1/(e - s):0.1f}")
+        image = machine.run_frame()
+        s = time.time()
+        renderer.render(image)
+        data = renderer.get_render_result()
+        video.update(data)
+        e = time.time()
+        print(f"[FPS] {1/(e - s):0.1f}")
     if args.stop:
         while True:
             pass
+    video.close()
+    if args.record and not args.play:
+        machine.movie.save(args.record)
+    cpu.set_trace(TraceMode.OFF)
     print("success!")
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("-l", "--loop", type=int, default=-1, help="loop")
+    parser.add_argument("-l", "--loop", type=int, default=-1, help="num of frames")
     parser.add_argument("-r", "--rom", default="", help="rom")
     parser.add_argument("-s", "--stop", action="store_true", help="stop after num of loop run")
+    parser.add_argument("-v", "--video", default="window", choices=["window", "headless", "png", "raw"], help="frame output")
+    parser.add_argument("-o", "--out", default="sample/frames", help="output dir of png/raw frames")
+    parser.add_argument("--scale", type=int, default=1, choices=[1, 2, 3], help="window scale")
+    parser.add_argument("-t", "--trace", default="off", choices=["off", "ring", "full"], help="cpu trace mode")
+    parser.add_argument("-b", "--block-cache", action="store_true", help="run translated blocks of prog rom")
+    parser.add_argument("--record", default="", help="record pad input to a movie")
+    parser.add_argument("--play", default="", help="play pad input from a movie")
+    parser.add_argument("--trace-path", default="sample/trace.bin", help="output of full trace")
     args = parser.parse_args()
     print(vars(args), tag="args", tag_color="green", color="white")
 
@@ -1,16 +1,24 @@
 __version__ = '0.1.0'
 
+from collections import deque
+import contextlib
 import copy
 from dataclasses import *
 from enum import auto, Enum
+import hashlib
+import io
 import logging
 import logging.config
+import mmap
+import multiprocessing
 import numpy as np
 from pathlib import Path
+import struct
 import sys
 import time
 import traceback
-from typing import DefaultDict
+from typing import Callable, DefaultDict
+import zlib
 
 from hexdump import hexdump
 from pprint import *
@@ -29,7 +37,8 @@ class PynesLogger:
     @classmethod
     def get_logger(cls, name):
         if not hasattr(cls, "logger"):
-            with Path("conf/logging.yaml").open() as f:
+            with (Path(__file__).parent.parent /
+                    "conf/logging.yaml").open() as f:
                 logging_conf = yaml.safe_load(f)
             
             logging.config.dictConfig(logging_conf)
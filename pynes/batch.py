@@ -0,0 +1,114 @@
+import argparse
+
+from pynes import *
+from pynes.movie import *
+from pynes.nes import *
+from pynes.ram import *
+from pynes.renderer import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    run many roms, or a rom with many input movies, headless in a
+    process pool
+
+    $ python -m pynes.batch rom/hello.nes rom/nestest.nes -f 60 -o report.yaml
+    $ python -m pynes.batch rom/nestest.nes -m a.movie b.movie
+'''
+
+BATCH_FRAMES = 60
+
+@dataclass
+class Job:
+    rom: str
+    frames: int = BATCH_FRAMES
+    # pad input, see pynes/movie.py
+    movie: str = ""
+    # hash WRAM of every frame
+    ram: bool = False
+
+@dataclass
+class Result:
+    rom: str
+    movie: str = ""
+    frames: int = 0
+    # hash_frame of every frame
+    frame_hashes: list = field(default_factory=list)
+    # hash_ram of every frame if Job.ram
+    ram_hashes: list = field(default_factory=list)
+    # digest of WRAM after the last frame
+    ram_digest: str = ""
+    fps: float = 0.0
+    error: str = ""
+
+def run_job(job):
+    result = Result(job.rom, job.movie)
+    try:
+        nes = Nes(job.rom)
+        nes.cpu.set_block_cache(True)
+        machine = nes
+        if job.movie:
+            machine = MoviePlayer(nes, Movie.load(job.movie))
+        renderer = Renderer()
+        start = time.time()
+        for _ in range(job.frames):
+            renderer.render(machine.run_frame())
+            result.frame_hashes.append(
+                hash_frame(renderer.get_render_result()))
+            if job.ram:
+                result.ram_hashes.append(hash_ram(nes.wram.data))
+            result.frames += 1
+        elapsed = time.time() - start
+        result.fps = result.frames / elapsed if elapsed else 0.0
+        result.ram_digest = hash_ram(nes.wram.data)
+    except Exception:
+        result.error = traceback.format_exc()
+    return result
+
+def run_job_indexed(indexed_job):
+    index, job = indexed_job
+    return index, run_job(job)
+
+# jobs are handed out one by one, a slow job does not hold back the others
+def run_batch(jobs, processes = None):
+    with multiprocessing.Pool(processes) as pool:
+        results = list(pool.imap_unordered(run_job_indexed,
+            enumerate(jobs), chunksize = 1))
+    return [result for _, result in sorted(results, key = lambda r: r[0])]
+
+def write_report(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents = True, exist_ok = True)
+    with path.open("w") as f:
+        yaml.safe_dump([asdict(result) for result in results], f,
+            sort_keys = False)
+
+def print_report(results):
+    table = [[r.rom, r.movie, r.frames, f"{r.fps:0.1f}", r.ram_digest,
+        r.frame_hashes[-1] if r.frame_hashes else "",
+        r.error.strip().splitlines()[-1] if r.error else ""]
+        for r in results]
+    print(tabulate(table,
+        headers = ["rom", "movie", "frames", "fps", "ram", "last frame", "error"]))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("roms", nargs="+", help="roms")
+    parser.add_argument("-m", "--movies", nargs="+", default=[], help="input movies for one rom")
+    parser.add_argument("-f", "--frames", type=int, default=BATCH_FRAMES, help="frames per job")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes, default: num of cpus")
+    parser.add_argument("-o", "--out", default="sample/report.yaml", help="report")
+    args = parser.parse_args()
+
+    if args.movies:
+        assert len(args.roms) == 1, "movies are for one rom"
+        jobs = [Job(args.roms[0], args.frames, movie)
+            for movie in args.movies]
+    else:
+        jobs = [Job(rom, args.frames) for rom in args.roms]
+    results = run_batch(jobs, args.jobs)
+    write_report(results, args.out)
+    print_report(results)
+    return 1 if any(result.error for result in results) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+from pynes import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [CPU MEMORY MAP]
+    | addr           |  description               |
+    +----------------+----------------------------+
+    | 0x0000-0x07FF  |  WRAM                      |
+    | 0x0800-0x1FFF  |  mirror of 0x0000-0x07FF   |
+    | 0x2000-0x2007  |  PPU registers             |
+    | 0x2008-0x3FFF  |  mirror of 0x2000-0x2007   |
+    | 0x4000-0x401F  |  APU I/O, PAD              |
+    | 0x4020-0x5FFF  |  ext rom                   |
+    | 0x6000-0x7FFF  |  ext ram                   |
+    | 0x8000-0xBFFF  |  prog rom                  |
+    | 0xC000-0xFFFF  |  prog rom                  |
+'''
+
+PAGE_SIZE = 0x0100
+PAGE_NUM = 0x0100
+
+class Bus:
+    '''
+        256 pages of 256 bytes, a page is either a memoryview of the
+        mapped memory or served by an io handler (read(addr),
+        write(addr, data)) when the memoryview is None.
+        pages are rebuilt only by map/map_io.
+    '''
+    def __init__(self):
+        self.read_pages = [None] * PAGE_NUM
+        self.write_pages = [None] * PAGE_NUM
+        self.read_handlers = [self.unmapped_read] * PAGE_NUM
+        self.write_handlers = [self.unmapped_write] * PAGE_NUM
+        # num of writes, tells whether the memory may have changed
+        self.writes = 0
+
+    # map addr - addr + size to buf[offset:], buf shorter than size is
+    # mirrored, writes to read only buf (bytes) go to `write`
+    def map(self, addr, size, buf, offset = 0, write = None):
+        assert not (addr % PAGE_SIZE or size % PAGE_SIZE), \
+            f"not aligned: {hex(addr)}, {hex(size)}"
+        view = memoryview(buf)
+        for i in range(size // PAGE_SIZE):
+            start = (offset + i * PAGE_SIZE) % len(view)
+            page = view[start:start + PAGE_SIZE]
+            index = (addr >> 8) + i
+            self.read_pages[index] = page
+            self.write_pages[index] = None if page.readonly else page
+            self.read_handlers[index] = self.unmapped_read
+            self.write_handlers[index] = write or self.unmapped_write
+
+    def map_io(self, addr, size, read, write):
+        assert not (addr % PAGE_SIZE or size % PAGE_SIZE), \
+            f"not aligned: {hex(addr)}, {hex(size)}"
+        for index in range(addr >> 8, (addr + size) >> 8):
+            self.read_pages[index] = None
+            self.write_pages[index] = None
+            self.read_handlers[index] = read
+            self.write_handlers[index] = write
+
+    def read(self, addr):
+        page = self.read_pages[addr >> 8]
+        if page is None:
+            return self.read_handlers[addr >> 8](addr)
+        return page[addr & 0xFF]
+
+    def write(self, addr, data):
+        self.writes += 1
+        page = self.write_pages[addr >> 8]
+        if page is None:
+            self.write_handlers[addr >> 8](addr, data)
+        else:
+            page[addr & 0xFF] = data
+
+    # PAGE_SIZE bytes of a page, a view of the mapped memory
+    def read_page(self, index):
+        page = self.read_pages[index]
+        if page is None:
+            addr = index << 8
+            return bytes(self.read(addr + i) for i in range(PAGE_SIZE))
+        return page
+
+    def unmapped_read(self, addr):
+        logger.error(f"{hex(addr)}")
+        raise NotImplementedError
+
+    def unmapped_write(self, addr, data):
+        logger.error(f"{hex(addr)}, {hex(data)}")
+        raise NotImplementedError
@@ -1,6 +1,23 @@
 from pynes import *
+from pynes.mapper import *
+
+'''
+    [iNES HEADER]
+    | byte  | description                                           |
+    +-------+-------------------------------------------------------+
+    | 0-3   | "NES" 0x1A                                            |
+    | 4     | prog rom size in 16KB                                 |
+    | 5     | char rom size in 8KB, 0: char ram                     |
+    | 6     | 7-4: mapper lower, 3: four screen, 2: trainer,        |
+    |       | 1: battery, 0: mirroring 0: horizontal, 1: vertical   |
+    | 7     | 7-4: mapper upper, 3-2: 0x08 NES 2.0                  |
+    | 8-15  | unused, garbage of old dumpers                        |
+    | 16-   | trainer (512 bytes, if any), prog rom, char rom       |
+'''
 
 NES_HSIZE = 0x0010
+NES_MAGIC = b"NES\x1a"
+TRAINER_SIZE = 0x0200
 PROG_ROM_UNIT_SIZE = 0x4000
 CHAR_ROM_UNIT_SIZE = 0x2000
 
@@ -10,19 +27,36 @@ class Cassette:
     def __init__(self, path):
         self.path = Path(path)
         self.size = self.path.stat().st_size
+        assert self.size >= NES_HSIZE, f"not an iNES rom: {path}"
 
-        content = self.path.read_bytes()
+        # the roms are read only views of the mapped file, pages are
+        # loaded when they are first read
+        with self.path.open("rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        content = memoryview(self.mmap)
+        assert content[:4] == NES_MAGIC, f"not an iNES rom: {path}"
         self.prog_size = content[4] * PROG_ROM_UNIT_SIZE
         self.char_size = content[5] * CHAR_ROM_UNIT_SIZE
-        pprint(vars(self))
+        flags6, flags7 = content[6], content[7]
+        self.mapper_id = flags6 >> 4
+        # the upper nibble is garbage if the unused bytes are
+        if (flags7 & 0x0C) == 0x08 or not any(content[12:16]):
+            self.mapper_id |= flags7 & 0xF0
+        if flags6 & 0x08:
+            self.mirroring = Mirroring.FOUR_SCREEN
+        elif flags6 & 0x01:
+            self.mirroring = Mirroring.VERTICAL
+        else:
+            self.mirroring = Mirroring.HORIZONTAL
+        self.has_battery = bool(flags6 & 0x02)
+        trainer_size = TRAINER_SIZE if flags6 & 0x04 else 0
 
-        prog_rom_s = NES_HSIZE
-        prog_rom_e = char_rom_s = NES_HSIZE + self.prog_size
+        prog_rom_s = NES_HSIZE + trainer_size
+        prog_rom_e = char_rom_s = prog_rom_s + self.prog_size
         char_rom_e = char_rom_s + self.char_size
-        logger.info(f"{prog_rom_s} {hex(prog_rom_e)}")
-        logger.info(f"{char_rom_s} {hex(char_rom_e)}")
+        assert char_rom_e <= self.size, f"truncated rom: {path}"
+        # loaded to 0x7000 of ext ram
+        self.trainer = content[NES_HSIZE:prog_rom_s]
         self.prog_rom = content[prog_rom_s:prog_rom_e]
         self.char_rom = content[char_rom_s:char_rom_e]
-
-        # hexdump(self.prog_rom)
-        # hexdump(self.char_rom)
\ No newline at end of file
+        self.mapper = create_mapper(self)
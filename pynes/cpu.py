@@ -1,5 +1,8 @@
 from pynes import *
+from pynes.bus import *
+from pynes.opset import *
 from pynes.ram import *
+from pynes.trace import *
 
 logger = PynesLogger.get_logger(__name__)
 
@@ -9,6 +12,8 @@ CHAR_ROM_UNIT_SIZE = 0x2000
 
 WRAM_SIZE = 0x0800
 EXRAM_SIZE = 0x2000
+# cpu cycles stalled by sprite dma, one more from an odd cycle
+SPRITE_DMA_CYCLE = 513
 
 class Opcode(Enum):
     ADC = auto() 
@@ -178,47 +183,80 @@ addrmode_dic = {
     "ABS_IND" : Addrmode.ABS_IND
 }
 
+# last instruction of a translated block, they change PC
+BLOCK_END_OPCODES = {
+    Opcode.BCC, Opcode.BCS, Opcode.BEQ, Opcode.BNE,
+    Opcode.BVC, Opcode.BVS, Opcode.BPL, Opcode.BMI,
+    Opcode.JMP, Opcode.JSR, Opcode.RTS, Opcode.RTI, Opcode.BRK,
+    Opcode.NOPD, Opcode.NOPI
+}
+BLOCK_SIZE_MAX = 32
+
+def get_stat(rec):
+    stat = dict(zip(TRACE_FIELDS, rec))
+    op, mode = stat.pop("op"), stat.pop("mode")
+    stat["opset"] = Opcode(op).name if op else ""
+    stat["mode"] = Addrmode(mode).name if mode else ""
+    stat["data"] = "" if stat["data"] < 0 else stat["data"]
+    return stat
+
+def get_record(stat):
+    rec = dict(stat)
+    rec["op"] = opcode_dic[stat["opset"]].value if stat["opset"] else 0
+    rec["mode"] = addrmode_dic[stat["mode"]].value if stat["mode"] else 0
+    rec["data"] = -1 if stat["data"] == "" else stat["data"]
+    return tuple(rec.get(field, 0) for field in TRACE_FIELDS)
+
+# OPSET with the names resolved, decoded once for every Cpu:
+# (op, mode, cycle, size, handler name, resolver name)
+DECODED_OPSET = tuple(None if opset is None else
+    (opcode_dic[opset[0]], addrmode_dic[opset[1]], *opset[2:],
+        f"exec_{opset[0]}", f"addr_{opset[1]}")
+    for opset in OPSET)
+
 @dataclass
-class Status:
-    CARRY: bool = False
-    ZERO: bool = False
-    INTERRUPT: bool = True
-    DECIMAL: bool = False
-    BREAK: bool = False
-    RESERVED: bool = True
-    OVERFLOW: bool = False
-    NEGATIVE: bool = False
+class Instruction:
+    op: Opcode
+    mode: Addrmode
+    cycle: int
+    exec: Callable
+    resolve: Callable
+    # bytes including the opcode
+    size: int = 1
+
+    @classmethod
+    def unknown(cls, opcode):
+        def not_implemented(*args):
+            raise NotImplementedError(f"unknown opcode: {opcode:02X}")
+        return cls(None, None, 0, not_implemented, not_implemented)
+
+'''
+    [Status Register]
+    | bit  | description                                 |
+    +------+---------------------------------------------+
+    |  7   | NEGATIVE                                    |
+    |  6   | OVERFLOW                                    |
+    |  5   | RESERVED, always 1                          |
+    |  4   | BREAK                                       |
+    |  3   | DECIMAL                                     |
+    |  2   | INTERRUPT                                   |
+    |  1   | ZERO                                        |
+    |  0   | CARRY                                       |
+'''
+
+FLAG_CARRY = 0x01
+FLAG_ZERO = 0x02
+FLAG_INTERRUPT = 0x04
+FLAG_DECIMAL = 0x08
+FLAG_BREAK = 0x10
+FLAG_RESERVED = 0x20
+FLAG_OVERFLOW = 0x40
+FLAG_NEGATIVE = 0x80
+STATUS_INIT = FLAG_INTERRUPT | FLAG_RESERVED
+
+# NEGATIVE and ZERO of a result byte
+NZ_TABLE = [(v & FLAG_NEGATIVE) | (0 if v else FLAG_ZERO) for v in range(0x100)]
 
-    def reset(self):
-        self.CARRY = False
-        self.ZERO = False
-        self.INTERRUPT = True
-        self.DECIMAL = False
-        self.BREAK = False
-        self.RESERVED = True
-        self.OVERFLOW = False
-        self.NEGATIVE = False
-
-    def get_val(self):
-        p = (1 << 0) if self.CARRY else 0
-        p += (1 << 1) if self.ZERO else 0
-        p += (1 << 2) if self.INTERRUPT else 0
-        p += (1 << 3) if self.DECIMAL else 0
-        p += (1 << 4) if self.BREAK else 0
-        p += (1 << 5) if self.RESERVED else 0
-        p += (1 << 6) if self.OVERFLOW else 0
-        p += (1 << 7) if self.NEGATIVE else 0
-        return p
-    
-    def set_val(self, p):
-        self.CARRY = p & (1 << 0) > 0
-        self.ZERO = p & (1 << 1) > 0
-        self.INTERRUPT = p & (1 << 2) > 0
-        self.DECIMAL = p & (1 << 3) > 0
-        self.BREAK = p & (1 << 4) > 0
-        self.RESERVED = p & (1 << 5) > 0
-        self.OVERFLOW = p & (1 << 6) > 0
-        self.NEGATIVE = p & (1 << 7) > 0
 @dataclass
 class Register:
     A: int = 0x00
@@ -226,14 +264,16 @@ class Register:
     Y: int = 0x00
     SP: int = 0x01FD
     PC: int = 0x00
-    P: Status = Status()
+    P: int = STATUS_INIT
 
     def reset(self):
         self.A = 0x00
         self.B = 0x00
         self.X = 0x00
         self.SP = 0x01FD
-        self.P.reset()
+        self.P = STATUS_INIT
+
+PAD_BUTTONS = ("A", "B", "STA", "SEL", "UP", "DOWN", "LEFT", "RIGHT")
 
 @dataclass
 class PadRegister:
@@ -266,6 +306,15 @@ class PadRegister:
         self.count = 0
         self.io_reg = 0
 
+    # buttons as a bit mask, bit n: PAD_BUTTONS[n]
+    def get_buttons(self):
+        return sum(1 << i for i, name in enumerate(PAD_BUTTONS)
+            if getattr(self, name))
+
+    def set_buttons(self, buttons):
+        for i, name in enumerate(PAD_BUTTONS):
+            setattr(self, name, bool(buttons & (1 << i)))
+
     def read(self):
         # print(self)
         self.count += 1
@@ -305,6 +354,8 @@ class Cpu:
     def __init__(self, cas, ram, ppu, inter):
         self.op_index = 0
         self.cycle = 0
+        self.add_cycle = 0
+        self.has_branched = False
         self.pad1 = PadRegister()
         self.pad2 = PadRegister()
         self.reg = Register()
@@ -313,164 +364,295 @@ class Cpu:
         self.inter = inter
         self.exram = Ram(EXRAM_SIZE)
         self.cas = cas
+        # pc -> translated block of prog rom, None: disabled
+        self.blocks = None
+        # num of flush_blocks, a running block stops after a remap
+        self.remaps = 0
+        # skip polling loops until the next ppu event, see skip_idle_loop
+        self.idle_skip = True
+        self.idle = None
+        self.io_reads = 0
+        self.bus = Bus()
+        self.map_memory()
         self.reset()
-        self.dump = []
-
-        with Path("opset.yaml").open() as f:
-            self.opset = yaml.safe_load(f)
+        self.trace = None
+        self.correct = None
+        self.verify = False
+        self.optable = self.build_optable(DECODED_OPSET)
 
     def reset(self):
         self.reg.reset()
         self.reg.PC = self.wread(0xFFFC)
         self.cycle += 7
         self.ppu.cycle += 3 * self.cycle
+        # cpu cycle the ppu has caught up to, and of the next ppu event
+        self.ppu_synced = self.cycle
+        self.ppu_deadline = self.cycle
+
+    # catch up the ppu to the current cycle, called before the ppu registers
+    # are accessed and when the next ppu event is due
+    def sync_ppu(self):
+        if self.cycle >= self.ppu_deadline:
+            # the event may change PPUSTATUS, polling loops are no longer
+            # in the same state (see skip_idle_loop)
+            self.idle = None
+        self.ppu.run(self.cycle - self.ppu_synced)
+        self.ppu_synced = self.cycle
+        self.ppu_deadline = self.cycle + self.ppu.get_next_event()
 
     def reset_addr(self, addr):
         self.reg.reset()
         self.reg.PC = addr
     
-    def load_correct_log(self, path):
+    # verify: compare every instruction with the log while running
+    def load_correct_log(self, path, verify = False):
         if Path(path).exists():
-            with Path(path).open() as f:
-                self.correct = yaml.safe_load(f)
+            self.correct = GoldenTrace(convert_log(path, get_record))
+            self.verify = verify
+            if verify and self.trace is None:
+                self.set_trace(TraceMode.RING)
         else:
             print(f"not exists: {path}")
 
+    def map_memory(self):
+        self.flush_blocks()
+        self.bus.map(0x0000, 0x2000, self.ram.data)
+        self.bus.map_io(0x2000, 0x2000, self.read_ppu, self.write_ppu)
+        self.bus.map_io(0x4000, PAGE_SIZE, self.read_io, self.write_io)
+        self.bus.map(0x6000, EXRAM_SIZE, self.exram.data)
+        self.exram.data[0x1000:0x1000 + len(self.cas.trainer)] = \
+            self.cas.trainer
+        # prog rom banks and the mapper registers
+        self.cas.mapper.connect(self)
+
     def bread(self, addr):
-        return self._read(addr)
+        return self.bus.read(addr)
 
     def wread(self, addr):
-        return self._read(addr) + (self._read(addr + 1) << 8)
-
-    def _read(self, addr):
-        assert 0x0000 <= addr <= 0xFFFF, "invalid addr!"
-        if addr < 0x2000:
-            # wram
-            return self.ram.data[addr % WRAM_SIZE]
-        elif addr < 0x4000:
-            # PPU
-            return self.ppu.read((addr - 0x2000) % 8)
+        return self.bus.read(addr) + (self.bus.read(addr + 1) << 8)
+
+    def write(self, addr, data):
+        self.bus.write(addr, data)
+
+    # 0x2000 - 0x3FFF
+    def read_ppu(self, addr):
+        self.sync_ppu()
+        if addr & 0x07 != 0x02:
+            self.io_reads += 1
+        return self.ppu.read((addr - 0x2000) % 8)
+
+    def write_ppu(self, addr, data):
+        self.sync_ppu()
+        self.ppu.write((addr - 0x2000) % 8, data)
+
+    # 0x4000 - 0x40FF
+    def read_io(self, addr):
+        self.io_reads += 1
+        if addr == 0x4016:
+            # keypad 1P
+            return self.pad1.read()
+        # DMA, keypad 2P, APU I/O, ext rom
+        raise NotImplementedError
+
+    def write_io(self, addr, data):
+        if addr == 0x4014:
+            # Sprite DMA from page `data`, the cpu stalls 513 cycles,
+            # 514 from an odd cycle
+            self.sync_ppu()
+            self.ppu.write_sprite_ram_dma(self.bus.read_page(data))
+            self.add_cycle += SPRITE_DMA_CYCLE + (self.cycle & 1)
+        elif addr == 0x4016:
+            # keypad 1P
+            self.pad1.write(data)
         elif addr < 0x4020:
-            if addr == 0x4014:
-                # DMA
-                raise NotImplementedError
-            elif addr == 0x4016:
-                # keypad 1P
-                # logger.info(f"pad1 read1 {self.pad1.count}")
-                data = self.pad1.read()
-                return data
-            elif addr == 0x4017:
-                # keypad 2P
-                pass
-                # logger.info("pad2 read")
-                # return self.pad2.read()
-            else:
-                # APU I/O
-                pass
-            raise NotImplementedError
-        elif addr < 0x6000:
-            # ext rom
-            raise NotImplementedError
-        elif addr < 0x8000:
-            # ext ram
-            return self.exram.data[addr - 0x8000]
-        elif addr < 0xC000:
-            # prog rom
-            return self.cas.prog_rom[addr - 0x8000]
-        elif addr < 0xFFFF:
-            # prog rom
-            if self.cas.prog_size <= 0x4000:
-                return self.cas.prog_rom[addr - 0xC000]
-            else:
-                return self.cas.prog_rom[addr - 0x8000]
+            # keypad 2P, APU I/O
+            pass
         else:
-            raise NotImplementedError
+            # ext rom
+            self.bus.unmapped_write(addr, data)
 
-    def write(self, addr, data):
-        assert 0x0000 <= addr <= 0xFFFF, "invalid addr!"
-        assert 0x00 <= data <= 0xFF, "invalid value!"
-        try:
-            if addr < 0x2000:
-                # mirror
-                self.ram.data[addr % WRAM_SIZE] = data
-            elif addr < 0x2008:
-                # PPU
-                self.ppu.write(addr - 0x2000, data)
-            elif 0x4000 <= addr < 0x4020:
-                if addr == 0x4014:
-                    # Sprite DMA
-                    ram_addr_s = data * SPRITE_RAM_SIZE
-                    self.ppu.write_sprite_ram_addr(0)
-                    for i in range(SPRITE_RAM_SIZE):
-                        self.ppu.write_sprite_ram_data(self.ram.data[ram_addr_s + i])
-                elif addr == 0x4016:
-                    # keypad 1P
-                    # logger.info(f"pad1 write {data}")
-                    self.pad1.write(data)
-                elif addr == 0x4017:
-                    # keypad 2P
-                    # logger.info(f"pad2 write {data}")
-                    # self.pad2.write(data)
-                    pass
-                else:
-                    # APU I/O
-                    pass 
-            elif 0x6000 <= addr < 0x8000:
-                self.ram.data[addr - 0x8000] = data
-            else:
-                raise NotImplementedError
-        except NotImplementedError:
-            logger.error(f"{hex(addr)}, {hex(data)}")
-            raise NotImplementedError
-        except:
-            traceback.format_exc()
-            # logger.error(hex(addr), hex(data))
-    
     def fetch(self, size):
-        if size in [1, 2]:
-            data = None
-            if size == 1:
-                data = self.bread(self.reg.PC)
-            else:
-                data = self.wread(self.reg.PC)
-            self.reg.PC += size
-            return data
+        if size == 1:
+            return self.fetch_byte()
+        elif size == 2:
+            return self.fetch_word()
         else:
             raise NotImplementedError
+
+    def fetch_byte(self):
+        data = self.bus.read(self.reg.PC)
+        self.reg.PC += 1
+        return data
+
+    def fetch_word(self):
+        data = self.wread(self.reg.PC)
+        self.reg.PC += 2
+        return data
     
     def branch(self, addr):
+        if addr < self.reg.PC and self.idle_skip:
+            self.skip_idle_loop(addr)
         self.reg.PC = addr
         self.has_branched = True
 
-    def check_stat(self, opset, oprand, pc):
-        self.dump_stat(opset, oprand, pc)
-        # self.comp_stat()
-        self.op_index += 1
-
-    def dump_stat(self, opset, oprand, pc):
-        op = {
-            "i" : self.op_index + 1,
-            "pc" : pc,
-            "opset" : opset['op'],
-            "mode" : opset['mode'],
-            "data" : oprand['data'],
-            "A" :self.reg.A,
-            "X" : self.reg.X,
-            "Y" : self.reg.Y,
-            "P" : self.reg.P.get_val(),
-            "SP" : self.reg.SP,
-            "line" : self.ppu.line,
-            "c_cycle" : self.cycle,
-            "p_cycle" : self.ppu.cycle
-        }
-        self.print_stat(op)
-        self.dump.append(op)
-    
+    def skip_idle_loop(self, addr):
+        '''
+            called at a backward jump. when an iteration of the loop
+            returns to the same registers without any write or io read
+            (except PPUSTATUS), every iteration is the same until the next
+            ppu event, so the iterations before it are skipped in bulk.
+        '''
+        if self.trace is not None:
+            return
+        reg = self.reg
+        state = (addr, reg.PC, reg.A, reg.X, reg.Y, reg.P, reg.SP,
+            self.bus.writes, self.io_reads)
+        if self.idle is not None and self.idle[0] == state:
+            _, cycle, op_index = self.idle
+            period = self.cycle - cycle
+            # every instruction of the skipped iterations ends before
+            # the deadline
+            n = (self.ppu_deadline - self.cycle - 1) // period
+            if n > 0:
+                self.cycle += n * period
+                self.op_index += n * (self.op_index - op_index)
+        self.idle = (state, self.cycle, self.op_index)
+
+    def set_trace(self, mode, size = TRACE_RING_SIZE, path = None):
+        if self.trace is not None:
+            self.trace.close()
+        self.trace = create_trace(mode, size, path)
+
+    # translate straight-line prog rom code into blocks, see run_block
+    def set_block_cache(self, enable):
+        self.blocks = {} if enable else None
+
+    # called when the prog rom mapping of [addr, addr + size) changes,
+    # every block is dropped without a range
+    def flush_blocks(self, addr = None, size = None):
+        if self.blocks is None:
+            return
+        self.remaps += 1
+        if addr is None:
+            self.blocks = {}
+            return
+        # a block ends at the next pc of its last step, None is a pc
+        # outside of prog rom
+        end = addr + size
+        for pc in [pc for pc, block in self.blocks.items() if pc < end and
+                (block[-1][-1] if block else pc + 1) > addr]:
+            del self.blocks[pc]
+
+    def is_prog_rom(self, addr):
+        # blocks stop at the end of the address space
+        if addr > 0xFFFF:
+            return False
+        page = self.bus.read_pages[addr >> 8]
+        return page is not None and page.readonly
+
+    def translate_block(self, pc):
+        '''
+            decode instructions from pc until one of BLOCK_END_OPCODES,
+            a step is (exec, mode, data, resolve, cycle, operand pc, next pc).
+            operands of IMPL, ACM, IMD, ZPG, ABS and REL are resolved here,
+            others by resolve at run time (they depend on registers or ram).
+            returns None if pc is not in prog rom.
+        '''
+        block = []
+        while len(block) < BLOCK_SIZE_MAX and self.is_prog_rom(pc):
+            inst = self.optable[self.bus.read(pc)]
+            if inst.op is None:
+                break
+            size = inst.size - 1
+            next_pc = pc + inst.size
+            if not self.is_prog_rom(next_pc - 1):
+                break
+            if size == 1:
+                operand = self.bus.read(pc + 1)
+            elif size == 2:
+                operand = self.bus.read(pc + 1) + (self.bus.read(pc + 2) << 8)
+            else:
+                operand = 0
+
+            data, resolve = operand, None
+            if inst.mode == Addrmode.REL:
+                data = operand + next_pc - (0 if operand < 0x80 else 0x100)
+            elif inst.mode not in (Addrmode.IMPL, Addrmode.ACM,
+                    Addrmode.IMD, Addrmode.ZPG, Addrmode.ABS):
+                data, resolve = 0, inst.resolve
+            block.append((inst.exec, inst.mode, data, resolve, inst.cycle,
+                pc + 1, next_pc))
+            if inst.op in BLOCK_END_OPCODES:
+                break
+            pc = next_pc
+        return block if block else None
+
+    # run a block until its end or the next ppu event, returns the cycles
+    def run_block(self, block):
+        remaps = self.remaps
+        reg = self.reg
+        cycles = 0
+        for exec, mode, data, resolve, cycle, operand_pc, next_pc in block:
+            self.add_cycle = 0
+            if resolve is None:
+                reg.PC = next_pc
+            else:
+                reg.PC = operand_pc
+                data = resolve()
+            self.op_index += 1
+            self.has_branched = False
+            exec(mode, data)
+            cycle += self.add_cycle + (1 if self.has_branched else 0)
+            self.cycle += cycle
+            cycles += cycle
+            if self.cycle >= self.ppu_deadline:
+                self.sync_ppu()
+                break
+            if self.remaps != remaps:
+                # remapped
+                break
+        return cycles
+
+    def check_stat(self, inst, data, pc):
+        self.sync_ppu()
+        self.dump_stat(inst, data, pc)
+        if self.verify:
+            self.comp_stat()
+
+    def dump_stat(self, inst, data, pc):
+        self.trace.record(
+            self.op_index + 1,
+            pc,
+            inst.op.value,
+            inst.mode.value,
+            data,
+            self.reg.A,
+            self.reg.X,
+            self.reg.Y,
+            self.reg.P,
+            self.reg.SP & 0xFFFF,
+            self.ppu.line,
+            self.ppu.cycle,
+            self.cycle)
+
+    def get_dump(self, num):
+        if self.trace is None:
+            return []
+        return [get_stat(rec) for rec in self.trace.last(num)]
+
     def comp_stat(self):
-        # last one
-        sample_op = self.dump[-1]
         # load i-th log
-        correct_op = self.correct[self.op_index]
+        correct = self.correct.get(self.op_index)
+        if correct is None:
+            logger.info(f"end of log, {self.op_index} instructions verified")
+            self.verify = False
+            return
+        # last one
+        sample = self.trace.get(self.trace.count - 1)
+        if match_record(sample, correct):
+            return
+        sample_op = get_stat(sample)
+        correct_op = get_stat(correct)
         check_items = [
             "i",
             "pc",
@@ -519,7 +701,7 @@ class Cpu:
                         return obj
                     print(f"{sample_op[item]:X}",
                         tag = "sample", tag_color = "yellow")
-                    pprint(vars(self.reg.P))
+                    pprint(print_status(self.reg.P))
                     print(f"{correct_op[item]:X}",
                         tag = "correct", tag_color = "yellow")
                     pprint(print_status(correct_op[item]))
@@ -527,26 +709,33 @@ class Cpu:
         if failed:
             start, end = max(0, self.op_index - 10), self.op_index + 1
             print("", tag = "sample", tag_color = "yellow", color = "white")
-            for s in self.dump[start:end]:
+            for s in self.get_dump(end - start):
                 self.print_stat(s)
 
             print("", tag = "correct", tag_color = "yellow", color = "white")
-            for c in self.correct[start:end]:
-                self.print_stat(c)
+            for n in range(start, end):
+                self.print_stat(get_stat(self.correct.get(n)))
             assert False, "status check error!"
 
     def dump_stat_yaml(self, path):
         Path("sample").mkdir(exist_ok = True)
         with Path(path).open("w") as f:
-            yaml.dump(self.dump, f)
+            yaml.dump(self.get_dump(self.trace.size), f)
 
     def set_flag_for_after_calc(self, result):
-        result &= 0xFF
-        self.reg.P.NEGATIVE = bool(result & 0x80)
-        self.reg.P.ZERO = result == 0
+        self.reg.P = ((self.reg.P & ~(FLAG_NEGATIVE | FLAG_ZERO)) |
+            NZ_TABLE[result & 0xFF])
+
+    def set_carry(self, carry):
+        self.reg.P = ((self.reg.P & ~FLAG_CARRY) |
+            (FLAG_CARRY if carry else 0))
+
+    def set_overflow(self, overflow):
+        self.reg.P = ((self.reg.P & ~FLAG_OVERFLOW) |
+            (FLAG_OVERFLOW if overflow else 0))
 
     def push(self, data):
-        self.write(self.reg.SP & 0xFF | 0x100, data)
+        self.bus.write(self.reg.SP & 0xFF | 0x100, data)
         self.reg.SP -= 1
 
     def push_PC(self):
@@ -554,397 +743,474 @@ class Cpu:
         self.push(self.reg.PC & 0xFF)
     
     def push_reg_status(self):
-        self.push(self.reg.P.get_val())
+        self.push(self.reg.P)
 
     def pop(self):
         self.reg.SP += 1
-        return self.bread(self.reg.SP & 0xFF | 0x100)
+        return self.bus.read(self.reg.SP & 0xFF | 0x100)
 
     def pop_PC(self):
         self.reg.PC = self.pop()
         self.reg.PC += (self.pop() << 8)
     
     def pop_reg_status(self):
-        status = self.pop()
-        self.reg.P.set_val(status)
-
-    def get_op(self, opcode):
-        opset = self.opset[opcode]
-        mode = addrmode_dic[opset["mode"]]
-        oprand = DefaultDict(int)
-        oprand["add_cycle"] = 0
-        if mode in [Addrmode.ACM, Addrmode.IMPL]:
-            pass
-        elif mode in [Addrmode.IMD, Addrmode.ZPG]:
-            oprand["data"] = self.fetch(1)
-        elif mode == Addrmode.REL:
-            addr = self.fetch(1)
-            oprand["data"] = addr + self.reg.PC
-            oprand["data"] -= 0 if addr < 0x80 else 0x100
-        elif mode == Addrmode.ZPG_X:
-            oprand["data"] = (self.reg.X + self.fetch(1)) & 0xFF
-        elif mode == Addrmode.ZPG_Y:
-            oprand["data"] = (self.reg.Y + self.fetch(1)) & 0xFF
-        elif mode == Addrmode.ABS:
-            oprand["data"] = self.fetch(2)
-        elif mode == Addrmode.ABS_X:
-            addr = self.fetch(2)
-            oprand["data"] = (self.reg.X + addr) & 0xFFFF
-            # print("addr:", hex(addr), f"({addr%56})", 
-            #     "reg:", self.reg.X, f"({self.reg.X%256})",
-            #     "result:", hex(oprand["data"]))
-            oprand["add_cycle"] = \
-                int(((oprand["data"] ^ addr) & 0xFF00) > 0)
-        elif mode == Addrmode.ABS_Y:
-            addr = self.fetch(2)
-            oprand["data"] = (self.reg.Y + addr) & 0xFFFF
-            oprand["add_cycle"] = \
-                int(((oprand["data"] ^ addr) & 0xFF00) > 0)
-                # int((oprand["data"] & 0xFF00) != (addr & 0xFF00))
-        elif mode == Addrmode.IND_X:
-            base = (self.reg.X + self.fetch(1)) & 0xFF
-            base_ = (base + 1) & 0xFF
-            oprand["data"] = (self.bread(base) +
-                (self.bread(base_) << 8)) & 0xFFFF
-        elif mode == Addrmode.IND_Y:
-            base = self.fetch(1)
-            base_ = (base + 1) & 0xFF
-            data = self.bread(base) + (self.bread(base_) << 8)
-            oprand["data"] = (data + self.reg.Y) & 0xFFFF
-            oprand["add_cycle"] = \
-                int(((oprand["data"] ^ data) & 0xFF00) > 0)
-        elif mode == Addrmode.ABS_IND:
-            base = self.fetch(2)
-            base_ = (base & 0xFF00) + ((base + 1) & 0xFF)
-            oprand["data"] = self.bread(base) + (self.bread(base_) << 8)
+        self.reg.P = self.pop()
+
+    def build_optable(self, opset):
+        # opcode byte -> (handler, addressing mode resolver, base cycle)
+        optable = []
+        for opcode, opset_ in enumerate(opset):
+            if opset_ is None:
+                optable.append(Instruction.unknown(opcode))
+                continue
+            op, mode, cycle, size, exec, resolve = opset_
+            optable.append(Instruction(
+                op = op,
+                mode = mode,
+                cycle = cycle,
+                exec = getattr(self, exec),
+                resolve = getattr(self, resolve),
+                size = size))
+        return optable
+
+    # addressing mode resolvers
+    # return the effective address (immediate value for IMD) and leave
+    # the page crossing penalty in self.add_cycle
+    def addr_IMPL(self):
+        return 0
+
+    def addr_ACM(self):
+        return 0
+
+    def addr_IMD(self):
+        return self.fetch_byte()
+
+    def addr_ZPG(self):
+        return self.fetch_byte()
+
+    def addr_REL(self):
+        addr = self.fetch_byte()
+        return addr + self.reg.PC - (0 if addr < 0x80 else 0x100)
+
+    def addr_ZPG_X(self):
+        return (self.reg.X + self.fetch_byte()) & 0xFF
+
+    def addr_ZPG_Y(self):
+        return (self.reg.Y + self.fetch_byte()) & 0xFF
+
+    def addr_ABS(self):
+        return self.fetch_word()
+
+    def addr_ABS_X(self):
+        addr = self.fetch_word()
+        data = (self.reg.X + addr) & 0xFFFF
+        self.add_cycle = int(((data ^ addr) & 0xFF00) > 0)
+        return data
+
+    def addr_ABS_Y(self):
+        addr = self.fetch_word()
+        data = (self.reg.Y + addr) & 0xFFFF
+        self.add_cycle = int(((data ^ addr) & 0xFF00) > 0)
+        return data
+
+    def addr_IND_X(self):
+        base = (self.reg.X + self.fetch_byte()) & 0xFF
+        base_ = (base + 1) & 0xFF
+        return (self.bus.read(base) + (self.bus.read(base_) << 8)) & 0xFFFF
+
+    def addr_IND_Y(self):
+        base = self.fetch_byte()
+        base_ = (base + 1) & 0xFF
+        addr = self.bus.read(base) + (self.bus.read(base_) << 8)
+        data = (addr + self.reg.Y) & 0xFFFF
+        self.add_cycle = int(((data ^ addr) & 0xFF00) > 0)
+        return data
+
+    def addr_ABS_IND(self):
+        base = self.fetch_word()
+        base_ = (base & 0xFF00) + ((base + 1) & 0xFF)
+        return self.bus.read(base) + (self.bus.read(base_) << 8)
+
+    # load
+    def exec_LDA(self, mode, data):
+        self.reg.A = data if mode == Addrmode.IMD else self.bus.read(data)
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_LDX(self, mode, data):
+        self.reg.X = data if mode == Addrmode.IMD else self.bus.read(data)
+        self.set_flag_for_after_calc(self.reg.X)
+
+    def exec_LDY(self, mode, data):
+        self.reg.Y = data if mode == Addrmode.IMD else self.bus.read(data)
+        self.set_flag_for_after_calc(self.reg.Y)
+
+    # store
+    def exec_STA(self, mode, data):
+        self.bus.write(data, self.reg.A)
+
+    def exec_STX(self, mode, data):
+        self.bus.write(data, self.reg.X)
+
+    def exec_STY(self, mode, data):
+        self.bus.write(data, self.reg.Y)
+
+    # transfer
+    def exec_TAX(self, mode, data):
+        self.reg.X = self.reg.A
+        self.set_flag_for_after_calc(self.reg.X)
+
+    def exec_TAY(self, mode, data):
+        self.reg.Y = self.reg.A
+        self.set_flag_for_after_calc(self.reg.Y)
+
+    def exec_TSX(self, mode, data):
+        self.reg.X = self.reg.SP & 0xFF
+        self.set_flag_for_after_calc(self.reg.X)
+
+    def exec_TXA(self, mode, data):
+        self.reg.A = self.reg.X
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_TXS(self, mode, data):
+        self.reg.SP = self.reg.X + 0x0100
+
+    def exec_TYA(self, mode, data):
+        self.reg.A = self.reg.Y
+        self.set_flag_for_after_calc(self.reg.A)
+
+    # op
+    def exec_ADC(self, mode, data):
+        data_ = data if mode == Addrmode.IMD else self.bus.read(data)
+        result = self.reg.A + data_ + (self.reg.P & FLAG_CARRY)
+        self.set_carry(result > 0xFF and
+            self.reg.A < 0xFF and data_ < 0xFF)
+        self.set_overflow(
+            ((data_ ^ result) & 0x80) and
+            ((self.reg.A ^ result) & 0x80))
+        self.set_flag_for_after_calc(result)
+        self.reg.A = result & 0xFF
+
+    def exec_AND(self, mode, data):
+        data_ = data if mode == Addrmode.IMD else self.bus.read(data)
+        self.reg.A &= data_
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_ASL(self, mode, data):
+        result = self.reg.A if mode == Addrmode.ACM else self.bus.read(data)
+        self.set_carry(result & 0x80)
+        result = (result << 1) & 0xFF
+        if mode == Addrmode.ACM:
+            self.reg.A = result
         else:
-            raise NotImplementedError
-        return opset, oprand
+            self.bus.write(data, result)
+        self.set_flag_for_after_calc(result)
 
-    def exec(self, opset, oprand):
-        op = opcode_dic[opset["op"]]
-        data = oprand["data"]
-        mode = addrmode_dic[opset["mode"]]
-        self.has_branched = False
-        # load
-        if op in [Opcode.LDA, Opcode.LDX, Opcode.LDY]:
-            data_ = data if mode == Addrmode.IMD else self.bread(data)
-            if op == Opcode.LDA:
-                self.reg.A = data_
-            elif op == Opcode.LDX:
-                self.reg.X = data_
-            elif op == Opcode.LDY:
-                self.reg.Y = data_
-            else:
-                raise NotImplementedError
-            self.set_flag_for_after_calc(data_)
-        # store
-        elif op == Opcode.STA:
-            self.write(data, self.reg.A)
-        elif op == Opcode.STX:
-            self.write(data, self.reg.X)
-        elif op == Opcode.STY:
-            self.write(data, self.reg.Y)
-        # transfer
-        elif op == Opcode.TAX:
-            self.reg.X = self.reg.A
-            self.set_flag_for_after_calc(self.reg.X)
-        elif op == Opcode.TAY:
-            self.reg.Y = self.reg.A
-            self.set_flag_for_after_calc(self.reg.Y)
-        elif op == Opcode.TSX:
-            self.reg.X = self.reg.SP & 0xFF
-            self.set_flag_for_after_calc(self.reg.X)
-        elif op == Opcode.TXA:
-            self.reg.A = self.reg.X
-            self.set_flag_for_after_calc(self.reg.A)
-        elif op == Opcode.TXS:
-            self.reg.SP = self.reg.X + 0x0100
-        elif op == Opcode.TYA:
-            self.reg.A = self.reg.Y
-            self.set_flag_for_after_calc(self.reg.A)
-        # op
-        elif op == Opcode.ADC:
-            data_ = data if mode == Addrmode.IMD else self.bread(data)
-            result = self.reg.A + data_ + int(self.reg.P.CARRY)
-            self.reg.P.CARRY = (result > 0xFF and
-                self.reg.A < 0xFF and data_ < 0xFF)
-            self.reg.P.OVERFLOW = bool(
-                ((data_ ^ result) & 0x80) and
-                ((self.reg.A ^ result) & 0x80))
-            self.set_flag_for_after_calc(result)
-            self.reg.A = result & 0xFF
-        elif op == Opcode.AND:
-            data_ = data if mode == Addrmode.IMD else self.bread(data)
-            self.reg.A &= data_
-            self.set_flag_for_after_calc(self.reg.A) 
-        elif op == Opcode.ASL:
-            result = self.reg.A if mode == Addrmode.ACM else self.bread(data)
-            self.reg.P.CARRY = bool(result & 0x80)
-            result = (result << 1) & 0xFF
-            if mode == Addrmode.ACM:
-                self.reg.A = result
-            else:
-                self.write(data, result)
-            self.set_flag_for_after_calc(result)
-        elif op == Opcode.BIT:
-            data_ = self.bread(data)
-            self.reg.P.OVERFLOW = bool(data_ & 0x40)
-            self.reg.P.NEGATIVE = bool(data_ & 0x80)
-            self.reg.P.ZERO = not (data_ & self.reg.A)
-        elif op == Opcode.CMP:
-            result = data if mode == Addrmode.IMD else self.bread(data)
-            comp = self.reg.A - result
-            self.reg.P.CARRY = (comp >= 0)
-            self.set_flag_for_after_calc(comp)
-        elif op == Opcode.CPX:
-            result = data if mode == Addrmode.IMD else self.bread(data)
-            comp = self.reg.X - result
-            self.reg.P.CARRY = (comp >= 0)
-            self.set_flag_for_after_calc(comp)
-        elif op == Opcode.CPY:
-            result = data if mode == Addrmode.IMD else self.bread(data)
-            comp = self.reg.Y - result
-            self.reg.P.CARRY = (comp >= 0)
-            self.set_flag_for_after_calc(comp)
-        # inc/dec
-        elif op == Opcode.DEC:
-            data_ = (self.bread(data) - 1) & 0xFF
-            self.write(data, data_)
-            self.set_flag_for_after_calc(data_)
-        elif op == Opcode.DEX:
-            self.reg.X = (self.reg.X - 1) & 0xFF
-            self.set_flag_for_after_calc(self.reg.X)
-        elif op == Opcode.DEY:
-            self.reg.Y = (self.reg.Y - 1) & 0xFF
-            self.set_flag_for_after_calc(self.reg.Y)
-        elif op == Opcode.EOR:
-            self.reg.A ^= data if mode == Addrmode.IMD else self.bread(data)
-            self.set_flag_for_after_calc(self.reg.A)
-        elif op == Opcode.INC:
-            data_ = (self.bread(data) + 1) & 0xFF
-            self.write(data, data_)
-            self.set_flag_for_after_calc(data_)
-        elif op == Opcode.INX:
-            self.reg.X = (self.reg.X + 1) & 0xFF
-            self.set_flag_for_after_calc(self.reg.X)
-        elif op == Opcode.INY:
-            self.reg.Y = (self.reg.Y + 1) & 0xFF
-            self.set_flag_for_after_calc(self.reg.Y)
-        elif op == Opcode.LSR:
-            result = self.reg.A if mode == Addrmode.ACM else self.bread(data)
-            self.reg.P.CARRY = result & 0x01
-            result = (result >> 1) & 0xFF
-            self.reg.P.ZERO = (result == 0)
-            if mode == Addrmode.ACM:
-                self.reg.A = result
-            else:
-                self.write(data, result)
-            self.reg.P.NEGATIVE = False
-        elif op == Opcode.ORA:
-            result = data if mode == Addrmode.IMD else self.bread(data)
-            self.reg.A |= result
-            self.set_flag_for_after_calc(self.reg.A)
-        elif op == Opcode.ROL:
-            result = self.reg.A if mode == Addrmode.ACM else self.bread(data)
-            carry = self.reg.P.CARRY
-            self.reg.P.CARRY = bool(result & 0x80)
-            result = (result << 1) & 0xFF
-            result = (result | 0x01) if carry else (result & ~0x01)
-            if mode == Addrmode.ACM:
-                self.reg.A = result
-            else:
-                self.write(data, result)
-            self.set_flag_for_after_calc(result)
-        elif op == Opcode.ROR:
-            result = self.reg.A if mode == Addrmode.ACM else self.bread(data)
-            carry = self.reg.P.CARRY
-            self.reg.P.CARRY = bool(result & 0x01)
-            result = (result >> 1) & 0xFF
-            result = (result | 0x80) if carry else (result & ~0x80)
-            self.reg.P.ZERO = (result == 0)
-            if mode == Addrmode.ACM:
-                self.reg.A = result
-            else:
-                self.write(data, result)
-            self.set_flag_for_after_calc(result)
-        elif op == Opcode.SBC:
-            data_ = data if mode == Addrmode.IMD else self.bread(data)
-            result = self.reg.A - data_ - int(not self.reg.P.CARRY)
-            self.reg.P.CARRY = not(result < 0)
-            self.reg.P.OVERFLOW = bool(
-                self.reg.P.CARRY and
-                (((data_ ^ result) & 0x80) or
-                ((self.reg.A ^ result) & 0x80)))
-            self.set_flag_for_after_calc(result)
-            self.reg.A = result & 0xFF
-        elif op == Opcode.PHA:
-            self.push(self.reg.A)
-        elif op == Opcode.PHP:
-            break_ = self.reg.P.BREAK
-            self.reg.P.BREAK = True
-            self.push_reg_status()
-            self.reg.P.BREAK = break_
-        elif op == Opcode.PLA:
-            self.reg.A = self.pop()
-            self.set_flag_for_after_calc(self.reg.A)
-        elif op == Opcode.PLP:
-            break_ = self.reg.P.BREAK
-            self.pop_reg_status()
-            self.reg.P.BREAK = break_
-            self.reg.P.RESERVED = True
-        elif op == Opcode.JMP:
-            self.reg.PC = data
-        elif op == Opcode.JSR:
-            pc = self.reg.PC - 1
-            self.push((pc >> 8) & 0xFF)
-            self.push(pc & 0xFF)
-            self.reg.PC = data
-        elif op == Opcode.RTS:
-            self.pop_PC()
-            self.reg.PC += 1
-        elif op == Opcode.RTI:
-            break_ = self.reg.P.BREAK
-            self.pop_reg_status()
-            self.pop_PC()
-            self.reg.P.BREAK = break_
-            self.reg.P.RESERVED = True
-        elif op == Opcode.BCS:
-            if self.reg.P.CARRY:
-                self.branch(data)
-        elif op == Opcode.BCC:
-            if not self.reg.P.CARRY:
-                self.branch(data)
-        elif op == Opcode.BEQ:
-            if self.reg.P.ZERO:
-                self.branch(data)
-        elif op == Opcode.BNE:
-            if not self.reg.P.ZERO:
-                self.branch(data)
-        elif op == Opcode.BMI:
-            if self.reg.P.NEGATIVE:
-                self.branch(data)
-        elif op == Opcode.BPL:
-            if not self.reg.P.NEGATIVE:
-                self.branch(data)
-        elif op == Opcode.BVS:
-            if self.reg.P.OVERFLOW:
-                self.branch(data)
-        elif op == Opcode.BVC:
-            if not self.reg.P.OVERFLOW:
-                self.branch(data)
-        elif op == Opcode.CLD:
-            self.reg.P.DECIMAL = False
-        elif op == Opcode.CLC:
-            self.reg.P.CARRY = False
-        elif op == Opcode.CLI:
-            self.reg.P.INTERRUPT = False
-        elif op == Opcode.CLV:
-            self.reg.P.OVERFLOW = False
-        elif op == Opcode.SEC:
-            self.reg.P.CARRY = True
-        elif op == Opcode.SEI:
-            self.reg.P.INTERRUPT = True
-        elif op == Opcode.SED:
-            self.reg.P.DECIMAL = True
-        elif op == Opcode.BRK:
-            self.reg.PC += 1
-            self.push_PC()
-            self.push_reg_status()
-            if not self.reg.P.INTERRUPT:
-                self.reg.PC = self.wread(0xFFFE)
-            self.reg.P.INTERRUPT = True
-            self.reg.PC -= 1
-        elif op == Opcode.NOP:
-            pass
-        # TODO: unofficial
-        elif op == Opcode.NOPD:
-            self.reg.PC += 1
-        elif op == Opcode.NOPI:
-            self.reg.PC += 2
-        elif op == Opcode.LAX:
-            self.reg.A = self.reg.X = self.bread(data)
-            self.set_flag_for_after_calc(self.reg.A)
-        elif op == Opcode.SAX:
-            self.write(data, self.reg.A & self.reg.X)
-        elif op == Opcode.DCP:
-            data_ = (self.bread(data) - 1) & 0xFF
-            self.set_flag_for_after_calc(self.reg.A - data_)
-            self.write(data, data_)
-        elif op == Opcode.ISB:
-            data_ = (self.bread(data) + 1) & 0xFF
-            data__ = (~data_ & 0xFF) + self.reg.A + self.reg.P.CARRY
-            self.reg.P.OVERFLOW = (not bool((self.reg.A ^ data_) & 0x80) and 
-                bool((self.reg.A ^ data__) & 0x80))
-            self.reg.P.CARRY = data__ > 0xFF
-            self.set_flag_for_after_calc(data__)
-            self.reg.A = data__ & 0xFF
-            self.write(data, data_)
-        elif op == Opcode.SLO:
-            data_ = self.bread(data)
-            self.reg.P.CARRY = bool(data_ & 0x80)
-            data_ = (data_ << 1) & 0xFF
-            self.reg.A |= data_
-            self.set_flag_for_after_calc(self.reg.A)
-            self.write(data, data_)
-        elif op == Opcode.RLA:
-            data_ = (self.bread(data) << 1) + self.reg.P.CARRY
-            self.reg.P.CARRY = bool(data_ & 0x100)
-            self.reg.A = (data_ & self.reg.A) & 0xFF
-            self.set_flag_for_after_calc(self.reg.A)
-            self.write(data, data_ & 0xFF)
-        elif op == Opcode.SRE:
-            data_ = self.bread(data)
-            self.reg.P.CARRY = bool(data_ & 0x01)
-            data_ >>= 1
-            self.reg.A ^= data_
-            self.set_flag_for_after_calc(self.reg.A)
-            self.write(data, data_)
-        elif op == Opcode.RRA:
-            data_ = self.bread(data)
-            carry = int(data_ & 0x01)
-            data_ = (data_ >> 1) + (0x80 if self.reg.P.CARRY else 0x00)
-            data__ = data_ + self.reg.A + carry
-            self.reg.P.OVERFLOW = (not bool((self.reg.A ^ data_) & 0x80) and 
-                bool((self.reg.A ^ data__) & 0x80))
-            self.set_flag_for_after_calc(data__)
-            self.reg.A = data__ & 0xFF
-            self.reg.P.CARRY = data__ > 0xFF
-            self.write(data, data_)
+    def exec_BIT(self, mode, data):
+        data_ = self.bus.read(data)
+        self.reg.P = ((self.reg.P &
+            ~(FLAG_OVERFLOW | FLAG_NEGATIVE | FLAG_ZERO)) |
+            (data_ & (FLAG_OVERFLOW | FLAG_NEGATIVE)) |
+            (0 if data_ & self.reg.A else FLAG_ZERO))
+
+    def exec_CMP(self, mode, data):
+        result = data if mode == Addrmode.IMD else self.bus.read(data)
+        comp = self.reg.A - result
+        self.set_carry(comp >= 0)
+        self.set_flag_for_after_calc(comp)
+
+    def exec_CPX(self, mode, data):
+        result = data if mode == Addrmode.IMD else self.bus.read(data)
+        comp = self.reg.X - result
+        self.set_carry(comp >= 0)
+        self.set_flag_for_after_calc(comp)
+
+    def exec_CPY(self, mode, data):
+        result = data if mode == Addrmode.IMD else self.bus.read(data)
+        comp = self.reg.Y - result
+        self.set_carry(comp >= 0)
+        self.set_flag_for_after_calc(comp)
+
+    # inc/dec
+    def exec_DEC(self, mode, data):
+        data_ = (self.bus.read(data) - 1) & 0xFF
+        self.bus.write(data, data_)
+        self.set_flag_for_after_calc(data_)
+
+    def exec_DEX(self, mode, data):
+        self.reg.X = (self.reg.X - 1) & 0xFF
+        self.set_flag_for_after_calc(self.reg.X)
+
+    def exec_DEY(self, mode, data):
+        self.reg.Y = (self.reg.Y - 1) & 0xFF
+        self.set_flag_for_after_calc(self.reg.Y)
+
+    def exec_EOR(self, mode, data):
+        self.reg.A ^= data if mode == Addrmode.IMD else self.bus.read(data)
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_INC(self, mode, data):
+        data_ = (self.bus.read(data) + 1) & 0xFF
+        self.bus.write(data, data_)
+        self.set_flag_for_after_calc(data_)
+
+    def exec_INX(self, mode, data):
+        self.reg.X = (self.reg.X + 1) & 0xFF
+        self.set_flag_for_after_calc(self.reg.X)
+
+    def exec_INY(self, mode, data):
+        self.reg.Y = (self.reg.Y + 1) & 0xFF
+        self.set_flag_for_after_calc(self.reg.Y)
+
+    def exec_LSR(self, mode, data):
+        result = self.reg.A if mode == Addrmode.ACM else self.bus.read(data)
+        self.set_carry(result & 0x01)
+        result = (result >> 1) & 0xFF
+        if mode == Addrmode.ACM:
+            self.reg.A = result
         else:
-            raise NotImplementedError
+            self.bus.write(data, result)
+        self.set_flag_for_after_calc(result)
+
+    def exec_ORA(self, mode, data):
+        result = data if mode == Addrmode.IMD else self.bus.read(data)
+        self.reg.A |= result
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_ROL(self, mode, data):
+        result = self.reg.A if mode == Addrmode.ACM else self.bus.read(data)
+        carry = self.reg.P & FLAG_CARRY
+        self.set_carry(result & 0x80)
+        result = (result << 1) & 0xFF
+        result = (result | 0x01) if carry else (result & ~0x01)
+        if mode == Addrmode.ACM:
+            self.reg.A = result
+        else:
+            self.bus.write(data, result)
+        self.set_flag_for_after_calc(result)
+
+    def exec_ROR(self, mode, data):
+        result = self.reg.A if mode == Addrmode.ACM else self.bus.read(data)
+        carry = self.reg.P & FLAG_CARRY
+        self.set_carry(result & 0x01)
+        result = (result >> 1) & 0xFF
+        result = (result | 0x80) if carry else (result & ~0x80)
+        if mode == Addrmode.ACM:
+            self.reg.A = result
+        else:
+            self.bus.write(data, result)
+        self.set_flag_for_after_calc(result)
+
+    def exec_SBC(self, mode, data):
+        data_ = data if mode == Addrmode.IMD else self.bus.read(data)
+        result = self.reg.A - data_ - (0 if self.reg.P & FLAG_CARRY else 1)
+        self.set_carry(not(result < 0))
+        self.set_overflow(
+            (self.reg.P & FLAG_CARRY) and
+            (((data_ ^ result) & 0x80) or
+            ((self.reg.A ^ result) & 0x80)))
+        self.set_flag_for_after_calc(result)
+        self.reg.A = result & 0xFF
+
+    # stack
+    def exec_PHA(self, mode, data):
+        self.push(self.reg.A)
+
+    def exec_PHP(self, mode, data):
+        self.push(self.reg.P | FLAG_BREAK)
+
+    def exec_PLA(self, mode, data):
+        self.reg.A = self.pop()
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_PLP(self, mode, data):
+        break_ = self.reg.P & FLAG_BREAK
+        self.pop_reg_status()
+        self.reg.P = (self.reg.P & ~FLAG_BREAK) | break_ | FLAG_RESERVED
+
+    # jump
+    def exec_JMP(self, mode, data):
+        if data < self.reg.PC and self.idle_skip:
+            self.skip_idle_loop(data)
+        self.reg.PC = data
+
+    def exec_JSR(self, mode, data):
+        pc = self.reg.PC - 1
+        self.push((pc >> 8) & 0xFF)
+        self.push(pc & 0xFF)
+        self.reg.PC = data
+
+    def exec_RTS(self, mode, data):
+        self.pop_PC()
+        self.reg.PC += 1
+
+    def exec_RTI(self, mode, data):
+        break_ = self.reg.P & FLAG_BREAK
+        self.pop_reg_status()
+        self.pop_PC()
+        self.reg.P = (self.reg.P & ~FLAG_BREAK) | break_ | FLAG_RESERVED
+
+    # branch
+    def exec_BCS(self, mode, data):
+        if self.reg.P & FLAG_CARRY:
+            self.branch(data)
+
+    def exec_BCC(self, mode, data):
+        if not self.reg.P & FLAG_CARRY:
+            self.branch(data)
+
+    def exec_BEQ(self, mode, data):
+        if self.reg.P & FLAG_ZERO:
+            self.branch(data)
+
+    def exec_BNE(self, mode, data):
+        if not self.reg.P & FLAG_ZERO:
+            self.branch(data)
+
+    def exec_BMI(self, mode, data):
+        if self.reg.P & FLAG_NEGATIVE:
+            self.branch(data)
+
+    def exec_BPL(self, mode, data):
+        if not self.reg.P & FLAG_NEGATIVE:
+            self.branch(data)
+
+    def exec_BVS(self, mode, data):
+        if self.reg.P & FLAG_OVERFLOW:
+            self.branch(data)
+
+    def exec_BVC(self, mode, data):
+        if not self.reg.P & FLAG_OVERFLOW:
+            self.branch(data)
+
+    # flag
+    def exec_CLD(self, mode, data):
+        self.reg.P &= ~FLAG_DECIMAL
+
+    def exec_CLC(self, mode, data):
+        self.reg.P &= ~FLAG_CARRY
+
+    def exec_CLI(self, mode, data):
+        self.reg.P &= ~FLAG_INTERRUPT
+
+    def exec_CLV(self, mode, data):
+        self.reg.P &= ~FLAG_OVERFLOW
+
+    def exec_SEC(self, mode, data):
+        self.reg.P |= FLAG_CARRY
+
+    def exec_SEI(self, mode, data):
+        self.reg.P |= FLAG_INTERRUPT
+
+    def exec_SED(self, mode, data):
+        self.reg.P |= FLAG_DECIMAL
+
+    # others
+    def exec_BRK(self, mode, data):
+        self.reg.PC += 1
+        self.push_PC()
+        self.push_reg_status()
+        if not self.reg.P & FLAG_INTERRUPT:
+            self.reg.PC = self.wread(0xFFFE)
+        self.reg.P |= FLAG_INTERRUPT
+        self.reg.PC -= 1
+
+    def exec_NOP(self, mode, data):
+        pass
+
+    # TODO: unofficial
+    def exec_NOPD(self, mode, data):
+        self.reg.PC += 1
+
+    def exec_NOPI(self, mode, data):
+        self.reg.PC += 2
+
+    def exec_LAX(self, mode, data):
+        self.reg.A = self.reg.X = self.bus.read(data)
+        self.set_flag_for_after_calc(self.reg.A)
+
+    def exec_SAX(self, mode, data):
+        self.bus.write(data, self.reg.A & self.reg.X)
+
+    def exec_DCP(self, mode, data):
+        data_ = (self.bus.read(data) - 1) & 0xFF
+        self.set_flag_for_after_calc(self.reg.A - data_)
+        self.bus.write(data, data_)
+
+    def exec_ISB(self, mode, data):
+        data_ = (self.bus.read(data) + 1) & 0xFF
+        data__ = (~data_ & 0xFF) + self.reg.A + (self.reg.P & FLAG_CARRY)
+        self.set_overflow(not ((self.reg.A ^ data_) & 0x80) and
+            ((self.reg.A ^ data__) & 0x80))
+        self.set_carry(data__ > 0xFF)
+        self.set_flag_for_after_calc(data__)
+        self.reg.A = data__ & 0xFF
+        self.bus.write(data, data_)
+
+    def exec_SLO(self, mode, data):
+        data_ = self.bus.read(data)
+        self.set_carry(data_ & 0x80)
+        data_ = (data_ << 1) & 0xFF
+        self.reg.A |= data_
+        self.set_flag_for_after_calc(self.reg.A)
+        self.bus.write(data, data_)
+
+    def exec_RLA(self, mode, data):
+        data_ = (self.bus.read(data) << 1) + (self.reg.P & FLAG_CARRY)
+        self.set_carry(data_ & 0x100)
+        self.reg.A = (data_ & self.reg.A) & 0xFF
+        self.set_flag_for_after_calc(self.reg.A)
+        self.bus.write(data, data_ & 0xFF)
+
+    def exec_SRE(self, mode, data):
+        data_ = self.bus.read(data)
+        self.set_carry(data_ & 0x01)
+        data_ >>= 1
+        self.reg.A ^= data_
+        self.set_flag_for_after_calc(self.reg.A)
+        self.bus.write(data, data_)
+
+    def exec_RRA(self, mode, data):
+        data_ = self.bus.read(data)
+        carry = int(data_ & 0x01)
+        data_ = (data_ >> 1) + (0x80 if self.reg.P & FLAG_CARRY else 0x00)
+        data__ = data_ + self.reg.A + carry
+        self.set_overflow(not ((self.reg.A ^ data_) & 0x80) and
+            ((self.reg.A ^ data__) & 0x80))
+        self.set_flag_for_after_calc(data__)
+        self.reg.A = data__ & 0xFF
+        self.set_carry(data__ > 0xFF)
+        self.bus.write(data, data_)
 
     def check_NMI(self):
         if not self.inter.get_nmi_assert():
             return
         self.inter.deassert_nmi()
-        self.reg.P.BREAK = False
+        self.reg.P &= ~FLAG_BREAK
         self.push_PC()
         self.push_reg_status()
-        self.reg.P.INTERRUPT = True
+        self.reg.P |= FLAG_INTERRUPT
         self.reg.PC = self.wread(0xFFFA)
 
     def check_IRQ(self):
         if not self.inter.get_irq_assert():
             return
-        if self.reg.P.INTERRUPT:
+        if self.reg.P & FLAG_INTERRUPT:
             return
         self.inter.deassert_irq()
-        self.reg.P.BREAK = False
+        self.reg.P &= ~FLAG_BREAK
         self.push_PC()
         self.push_reg_status()
-        self.reg.P.INTERRUPT = True
+        self.reg.P |= FLAG_INTERRUPT
         self.reg.PC = self.wread(0xFFFE)
 
     def print_stat(self, op):
-        return
-        if op["data"] == "":
-            op["data"] = 0x00
+        data = 0x00 if op["data"] == "" else op["data"]
         print(
             f"{op['i']:4d} {op['pc']:04X} {op['opset']:5s} {op['mode']:7s} "
-            f"{op['data']:04X} A:{op['A']:02X} X:{op['X']:02X} Y:{op['Y']:02X} "
+            f"{data:04X} A:{op['A']:02X} X:{op['X']:02X} Y:{op['Y']:02X} "
             f"P:{op['P']:02X} SP:{op['SP']:04X} "
-            f"PPU:{op['line']:3d},{op['p_cycle']:3d} CYC:{op['c_cycle']}"
+            f"PPU:{op.get('line', 0):3d},{op.get('p_cycle', 0):3d} "
+            f"CYC:{op.get('c_cycle', 0)}"
         )
 
     def run(self):
@@ -952,15 +1218,28 @@ class Cpu:
             self.check_NMI()
             self.check_IRQ()
             pc = self.reg.PC
-            opset, oprand = self.get_op(self.fetch(1))
-            self.check_stat(opset, oprand, pc)
-            self.exec(opset, oprand)
-            cycle = (opset["cycle"] + oprand["add_cycle"] +
+            if self.blocks is not None and self.trace is None:
+                if pc in self.blocks:
+                    block = self.blocks[pc]
+                else:
+                    block = self.blocks[pc] = self.translate_block(pc)
+                if block is not None:
+                    return self.run_block(block)
+            inst = self.optable[self.fetch_byte()]
+            self.add_cycle = 0
+            data = inst.resolve()
+            if self.trace is not None:
+                self.check_stat(inst, data, pc)
+            self.op_index += 1
+            self.has_branched = False
+            inst.exec(inst.mode, data)
+            cycle = (inst.cycle + self.add_cycle +
                 (1 if self.has_branched else 0))
             self.cycle += cycle
+            if self.cycle >= self.ppu_deadline:
+                self.sync_ppu()
             return cycle
         except Exception as e:
-            start, end = max(0, self.op_index - 5), self.op_index + 1
-            for a in self.dump[start:end]:
+            for a in self.get_dump(6):
                 self.print_stat(a)
             raise e
\ No newline at end of file
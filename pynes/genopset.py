@@ -0,0 +1,54 @@
+from pynes import *
+
+'''
+    compile opset.yaml into pynes/opset.py
+
+    $ python -m pynes.genopset
+'''
+
+OPSET_YAML = Path(__file__).parent.parent / "opset.yaml"
+OPSET_PY = Path(__file__).parent / "opset.py"
+
+# operand bytes of each addressing mode
+OPERAND_SIZE = {
+    "IMPL": 0,
+    "ACM": 0,
+    "IMD": 1,
+    "ZPG": 1,
+    "ZPG_X": 1,
+    "ZPG_Y": 1,
+    "ABS": 2,
+    "ABS_X": 2,
+    "ABS_Y": 2,
+    "REL": 1,
+    "IND_X": 1,
+    "IND_Y": 1,
+    "ABS_IND": 2,
+}
+
+# opcode -> (op, mode, cycle, size) or None
+def load_opset(path = OPSET_YAML):
+    with Path(path).open() as f:
+        opset = yaml.safe_load(f)
+    table = [None] * 0x100
+    for opcode, opset_ in opset.items():
+        mode = opset_["mode"]
+        table[opcode] = (opset_["op"], mode, opset_["cycle"],
+            1 + OPERAND_SIZE[mode])
+    return tuple(table)
+
+def render(table):
+    lines = [
+        "# generated from opset.yaml by `python -m pynes.genopset`,",
+        "# do not edit",
+        "",
+        "# opcode -> (op, mode, cycle, size), None: not implemented",
+        "OPSET = (",
+    ]
+    for opcode, entry in enumerate(table):
+        lines.append(f"    {entry!r},  # 0x{opcode:02X}")
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+if __name__ == '__main__':
+    OPSET_PY.write_text(render(load_opset()))
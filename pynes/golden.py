@@ -0,0 +1,93 @@
+import argparse
+
+from pynes import *
+from pynes.batch import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    golden frame regression check, runs roms headless and compares the
+    frame hashes (and WRAM hashes) with test_log/<rom>.frames.yaml
+
+    $ python -m pynes.golden rom/hello.nes rom/nestest.nes
+    $ python -m pynes.golden rom/hello.nes --update -f 30 --ram
+'''
+
+GOLDEN_DIR = Path(__file__).parent.parent / "test_log"
+GOLDEN_FRAMES = 30
+
+def get_golden_path(rom):
+    return GOLDEN_DIR / f"{Path(rom).stem}.frames.yaml"
+
+def make_golden(result):
+    return {
+        "rom": Path(result.rom).name,
+        "movie": result.movie,
+        "frames": result.frames,
+        "frame_hashes": result.frame_hashes,
+        "ram_hashes": result.ram_hashes,
+    }
+
+def save_golden(golden, path):
+    with Path(path).open("w") as f:
+        yaml.safe_dump(golden, f, sort_keys = False)
+
+def load_golden(path):
+    with Path(path).open() as f:
+        return yaml.safe_load(f)
+
+def get_golden_job(rom, golden):
+    return Job(rom, golden["frames"], golden["movie"],
+        bool(golden["ram_hashes"]))
+
+# differences between a golden and a result, empty if they match
+def compare_golden(golden, result):
+    if result.error:
+        return [result.error]
+    errors = []
+    for key in ["frame_hashes", "ram_hashes"]:
+        for frame, (expected, actual) in enumerate(
+                zip(golden[key], getattr(result, key))):
+            if expected != actual:
+                errors.append(f"{result.rom}: {key} differ from frame {frame}")
+                break
+    if result.frames != golden["frames"]:
+        errors.append(f"{result.rom}: {result.frames} frames, "
+            f"expected {golden['frames']}")
+    return errors
+
+def check_golden(roms, processes = None):
+    goldens = [load_golden(get_golden_path(rom)) for rom in roms]
+    jobs = [get_golden_job(rom, golden) for rom, golden in zip(roms, goldens)]
+    results = run_batch(jobs, processes)
+    return [error for golden, result in zip(goldens, results)
+        for error in compare_golden(golden, result)]
+
+def update_golden(roms, frames, ram = False, processes = None):
+    results = run_batch([Job(rom, frames, ram = ram) for rom in roms],
+        processes)
+    for result in results:
+        assert not result.error, result.error
+        save_golden(make_golden(result), get_golden_path(result.rom))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("roms", nargs="+", help="roms")
+    parser.add_argument("-u", "--update", action="store_true", help="record the goldens again")
+    parser.add_argument("-f", "--frames", type=int, default=GOLDEN_FRAMES, help="frames to record")
+    parser.add_argument("--ram", action="store_true", help="record WRAM hashes too")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes, default: num of cpus")
+    args = parser.parse_args()
+
+    if args.update:
+        update_golden(args.roms, args.frames, args.ram, args.jobs)
+        return 0
+    errors = check_golden(args.roms, args.jobs)
+    for error in errors:
+        print(error, tag = "golden", tag_color = "red", color = "white")
+    if not errors:
+        print("all frames match", tag = "golden", tag_color = "green",
+            color = "white")
+    return 1 if errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
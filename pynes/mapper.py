@@ -0,0 +1,318 @@
+from pynes import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [MAPPERS]
+    | id | name  | prog rom                    | char rom           | irq      |
+    +----+-------+-----------------------------+--------------------+----------+
+    | 0  | NROM  | 16KB mirrored or 32KB       | 8KB                |          |
+    | 1  | MMC1  | 16KB + fixed 16KB, or 32KB  | 4KB x 2 or 8KB     |          |
+    | 2  | UxROM | 16KB + fixed last 16KB      | 8KB                |          |
+    | 3  | CNROM | 16KB mirrored or 32KB       | 8KB banks          |          |
+    | 4  | MMC3  | 8KB x 2 + fixed 8KB x 2     | 2KB x 2 + 1KB x 4  | scanline |
+
+    registers of a mapper are written to the prog rom (0x8000-0xFFFF)
+'''
+
+class Mirroring(Enum):
+    HORIZONTAL = auto()
+    VERTICAL = auto()
+    SINGLE_LOWER = auto()
+    SINGLE_UPPER = auto()
+    FOUR_SCREEN = auto()
+
+# vram offset of the name tables 0x2000, 0x2400, 0x2800 and 0x2C00,
+# four screen needs 4KB vram on the cassette
+NAME_TABLE_OFFSETS = {
+    Mirroring.HORIZONTAL: (0x0000, 0x0000, 0x0400, 0x0400),
+    Mirroring.VERTICAL: (0x0000, 0x0400, 0x0000, 0x0400),
+    Mirroring.SINGLE_LOWER: (0x0000, 0x0000, 0x0000, 0x0000),
+    Mirroring.SINGLE_UPPER: (0x0400, 0x0400, 0x0400, 0x0400),
+    Mirroring.FOUR_SCREEN: (0x0000, 0x0400, 0x0800, 0x0C00),
+}
+
+class Mapper:
+    '''
+        NROM, and the base of the bank switching mappers.
+        banks are views of the roms, nothing is copied on a switch:
+        prog banks are mapped into the cpu bus (Bus.map), char banks
+        into the 1KB slots of the pattern tables (Ppu.map_char).
+        registers listed in STATE_FIELDS are saved by save states,
+        update() rebuilds the mapping from them.
+    '''
+    STATE_FIELDS = ()
+
+    def __init__(self, cas):
+        self.cas = cas
+        self.cpu = None
+        self.ppu = None
+        # addr -> (size, offset) of the mapped prog banks
+        self.prog_map = {}
+
+    # called by Cpu.map_memory
+    def connect(self, cpu):
+        self.cpu = cpu
+        self.ppu = cpu.ppu
+        self.prog_map = {}
+        self.reset()
+
+    # power on
+    def reset(self):
+        self.update()
+
+    def update(self):
+        self.map_prog(0x8000, 0x8000, 0)
+        self.map_char(0x0000, 0x2000, 0)
+        self.set_mirroring(self.cas.mirroring)
+
+    def write(self, addr, data):
+        self.cpu.bus.unmapped_write(addr, data)
+
+    # map bank `bank` of `size` bytes to addr, a negative bank counts
+    # from the last one
+    def map_prog(self, addr, size, bank):
+        offset = (bank * size) % len(self.cas.prog_rom)
+        if self.prog_map.get(addr) == (size, offset):
+            return
+        self.prog_map[addr] = (size, offset)
+        self.cpu.bus.map(addr, size, self.cas.prog_rom, offset,
+            write = self.write)
+        self.cpu.flush_blocks(addr, size)
+
+    def map_char(self, addr, size, bank):
+        self.ppu.map_char(addr, size, bank * size)
+
+    def set_mirroring(self, mirroring):
+        if self.cas.mirroring == Mirroring.FOUR_SCREEN:
+            mirroring = Mirroring.FOUR_SCREEN
+        self.ppu.set_mirroring(mirroring)
+
+    # called by the ppu on every rendered line
+    def clock_line(self):
+        pass
+
+    # num of clock_line until the irq, None: no irq
+    def get_irq_clocks(self):
+        return None
+
+    def get_state(self):
+        return bytes(int(getattr(self, name)) for name in self.STATE_FIELDS)
+
+    def set_state(self, state):
+        for name, value in zip(self.STATE_FIELDS, state):
+            setattr(self, name, value)
+        self.update()
+
+class NROM(Mapper):
+    pass
+
+class MMC1(Mapper):
+    '''
+        registers are written a bit at a time through a 5 bit shift
+        register, the fifth write selects the register by addr.
+        | addr           | register                                   |
+        +----------------+--------------------------------------------+
+        | 0x8000-0x9FFF  | control 4: char mode, 3-2: prog mode,      |
+        |                |         1-0: mirroring                     |
+        | 0xA000-0xBFFF  | char bank 0                                |
+        | 0xC000-0xDFFF  | char bank 1                                |
+        | 0xE000-0xFFFF  | prog bank                                  |
+    '''
+    STATE_FIELDS = ("shift", "control", "char_bank0", "char_bank1",
+        "prog_bank")
+    MIRRORING = (Mirroring.SINGLE_LOWER, Mirroring.SINGLE_UPPER,
+        Mirroring.VERTICAL, Mirroring.HORIZONTAL)
+
+    def reset(self):
+        # the marker bit reaches bit 0 after 4 writes
+        self.shift = 0x10
+        self.control = 0x0C
+        self.char_bank0 = 0
+        self.char_bank1 = 0
+        self.prog_bank = 0
+        self.update()
+
+    def write(self, addr, data):
+        if data & 0x80:
+            self.shift = 0x10
+            self.control |= 0x0C
+            self.update()
+            return
+        done = self.shift & 0x01
+        self.shift = (self.shift >> 1) | ((data & 0x01) << 4)
+        if not done:
+            return
+        register = (addr >> 13) & 0x03
+        if register == 0:
+            self.control = self.shift
+        elif register == 1:
+            self.char_bank0 = self.shift
+        elif register == 2:
+            self.char_bank1 = self.shift
+        else:
+            self.prog_bank = self.shift
+        self.shift = 0x10
+        self.update()
+
+    def update(self):
+        bank = self.prog_bank & 0x0F
+        mode = (self.control >> 2) & 0x03
+        if mode < 2:
+            self.map_prog(0x8000, 0x8000, bank >> 1)
+        elif mode == 2:
+            self.map_prog(0x8000, 0x4000, 0)
+            self.map_prog(0xC000, 0x4000, bank)
+        else:
+            self.map_prog(0x8000, 0x4000, bank)
+            self.map_prog(0xC000, 0x4000, -1)
+        if self.control & 0x10:
+            self.map_char(0x0000, 0x1000, self.char_bank0)
+            self.map_char(0x1000, 0x1000, self.char_bank1)
+        else:
+            self.map_char(0x0000, 0x2000, self.char_bank0 >> 1)
+        self.set_mirroring(self.MIRRORING[self.control & 0x03])
+
+class UxROM(Mapper):
+    STATE_FIELDS = ("prog_bank",)
+
+    def reset(self):
+        self.prog_bank = 0
+        self.update()
+
+    def write(self, addr, data):
+        self.prog_bank = data
+        self.update()
+
+    def update(self):
+        self.map_prog(0x8000, 0x4000, self.prog_bank)
+        self.map_prog(0xC000, 0x4000, -1)
+        self.map_char(0x0000, 0x2000, 0)
+        self.set_mirroring(self.cas.mirroring)
+
+class CNROM(Mapper):
+    STATE_FIELDS = ("char_bank",)
+
+    def reset(self):
+        self.char_bank = 0
+        self.update()
+
+    def write(self, addr, data):
+        self.char_bank = data
+        self.update()
+
+    def update(self):
+        self.map_prog(0x8000, 0x8000, 0)
+        self.map_char(0x0000, 0x2000, self.char_bank)
+        self.set_mirroring(self.cas.mirroring)
+
+class MMC3(Mapper):
+    '''
+        | addr          | even                   | odd                    |
+        +---------------+------------------------+------------------------+
+        | 0x8000-0x9FFF | bank select 7: char    | bank data              |
+        |               | inversion, 6: prog     |                        |
+        |               | mode, 2-0: bank        |                        |
+        | 0xA000-0xBFFF | mirroring              | prog ram protect       |
+        | 0xC000-0xDFFF | irq latch              | irq reload             |
+        | 0xE000-0xFFFF | irq disable            | irq enable             |
+
+        the irq counter is clocked on every rendered line, the irq is
+        asserted when it reaches 0 (see Ppu.get_next_event)
+    '''
+    STATE_FIELDS = ("bank_select", "mirroring", "irq_latch", "irq_counter",
+        "irq_reload", "irq_enabled")
+
+    def reset(self):
+        self.bank_select = 0
+        self.banks = bytearray(8)
+        self.mirroring = 0
+        self.irq_latch = 0
+        self.irq_counter = 0
+        self.irq_reload = False
+        self.irq_enabled = False
+        self.update()
+
+    def write(self, addr, data):
+        register = ((addr >> 12) & 0x06) | (addr & 0x01)
+        if register == 0:
+            self.bank_select = data
+        elif register == 1:
+            self.banks[self.bank_select & 0x07] = data
+        elif register == 2:
+            self.mirroring = data & 0x01
+        elif register == 3:
+            # prog ram is always enabled
+            return
+        else:
+            self.write_irq(register, data)
+            return
+        self.update()
+
+    def write_irq(self, register, data):
+        # the ppu catches up with the old counter, and reschedules
+        # the next event with the new one
+        self.cpu.sync_ppu()
+        if register == 4:
+            self.irq_latch = data
+        elif register == 5:
+            self.irq_counter = 0
+            self.irq_reload = True
+        elif register == 6:
+            self.irq_enabled = False
+            self.cpu.inter.deassert_irq()
+        else:
+            self.irq_enabled = True
+        self.cpu.sync_ppu()
+
+    def update(self):
+        banks = self.banks
+        swap = self.bank_select & 0x40
+        self.map_prog(0x8000, 0x2000, -2 if swap else banks[6])
+        self.map_prog(0xA000, 0x2000, banks[7])
+        self.map_prog(0xC000, 0x2000, banks[6] if swap else -2)
+        self.map_prog(0xE000, 0x2000, -1)
+        inversion = 0x1000 if self.bank_select & 0x80 else 0x0000
+        self.map_char(0x0000 ^ inversion, 0x0800, banks[0] >> 1)
+        self.map_char(0x0800 ^ inversion, 0x0800, banks[1] >> 1)
+        for i in range(4):
+            self.map_char((0x1000 + i * 0x0400) ^ inversion, 0x0400,
+                banks[2 + i])
+        self.set_mirroring(Mirroring.HORIZONTAL if self.mirroring
+            else Mirroring.VERTICAL)
+
+    def clock_line(self):
+        if self.irq_counter == 0 or self.irq_reload:
+            self.irq_counter = self.irq_latch
+            self.irq_reload = False
+        else:
+            self.irq_counter -= 1
+        if self.irq_counter == 0 and self.irq_enabled:
+            self.cpu.inter.assert_irq()
+
+    def get_irq_clocks(self):
+        if not self.irq_enabled:
+            return None
+        if self.irq_counter == 0 or self.irq_reload:
+            return self.irq_latch + 1
+        return self.irq_counter
+
+    def get_state(self):
+        return super().get_state() + bytes(self.banks)
+
+    def set_state(self, state):
+        self.banks[:] = state[len(self.STATE_FIELDS):]
+        super().set_state(state[:len(self.STATE_FIELDS)])
+
+# mapper number of the iNES header -> Mapper
+MAPPERS = {
+    0: NROM,
+    1: MMC1,
+    2: UxROM,
+    3: CNROM,
+    4: MMC3,
+}
+
+def create_mapper(cas):
+    if cas.mapper_id not in MAPPERS:
+        raise NotImplementedError(f"mapper {cas.mapper_id}")
+    return MAPPERS[cas.mapper_id](cas)
@@ -0,0 +1,76 @@
+from pynes import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [Input Movie]
+    | item    | description                                    |
+    +---------+------------------------------------------------+
+    | header  | magic, version, num of frames                  |
+    | frames  | pad1, pad2 buttons (PadRegister.get_buttons)   |
+    |         | 2 bytes a frame                                |
+'''
+
+MOVIE_MAGIC = b"PYNM"
+MOVIE_VERSION = 1
+MOVIE_HEADER = struct.Struct("<4sHI")
+
+class Movie:
+    def __init__(self, data = b""):
+        self.data = bytearray(data)
+
+    def __len__(self):
+        return len(self.data) // 2
+
+    def append(self, pad1, pad2 = 0):
+        self.data += bytes((pad1, pad2))
+
+    # buttons of the frame, released after the end
+    def get(self, frame):
+        if frame < len(self):
+            return self.data[frame * 2], self.data[frame * 2 + 1]
+        return 0, 0
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents = True, exist_ok = True)
+        with path.open("wb") as f:
+            f.write(MOVIE_HEADER.pack(MOVIE_MAGIC, MOVIE_VERSION, len(self)))
+            f.write(self.data)
+
+    @classmethod
+    def load(cls, path):
+        content = Path(path).read_bytes()
+        magic, version, frames = MOVIE_HEADER.unpack_from(content)
+        assert magic == MOVIE_MAGIC, f"not a movie: {path}"
+        assert version == MOVIE_VERSION, f"unsupported version: {version}"
+        data = content[MOVIE_HEADER.size:]
+        assert len(data) == frames * 2, f"broken movie: {path}"
+        return cls(data)
+
+# records the buttons at the start of every frame
+class MovieRecorder:
+    def __init__(self, nes, movie = None):
+        self.nes = nes
+        self.movie = Movie() if movie is None else movie
+
+    def run_frame(self):
+        cpu = self.nes.cpu
+        self.movie.append(cpu.pad1.get_buttons(), cpu.pad2.get_buttons())
+        return self.nes.run_frame()
+
+# sets the buttons at the start of every frame, no window needed
+class MoviePlayer:
+    def __init__(self, nes, movie):
+        self.nes = nes
+        self.movie = movie
+        self.frame = 0
+
+    def is_end(self):
+        return self.frame >= len(self.movie)
+
+    def run_frame(self):
+        pad1, pad2 = self.movie.get(self.frame)
+        self.nes.cpu.pad1.set_buttons(pad1)
+        self.nes.cpu.pad2.set_buttons(pad2)
+        self.frame += 1
+        return self.nes.run_frame()
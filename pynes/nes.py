@@ -0,0 +1,34 @@
+from pynes import *
+from pynes.cassette import *
+from pynes.cpu import *
+from pynes.interrupts import *
+from pynes.ppu import *
+from pynes.ram import *
+from pynes.state import *
+logger = PynesLogger.get_logger(__name__)
+
+class Nes:
+    def __init__(self, path):
+        self.cas = Cassette(path)
+        self.wram = Ram(WRAM_SIZE)
+        # four screen cassettes have another 2KB of vram
+        self.vram = Ram(VRAM_SIZE * 2 if self.cas.mirroring ==
+            Mirroring.FOUR_SCREEN else VRAM_SIZE)
+        self.inter = Interrupts()
+        self.ppu = Ppu(self.cas, self.vram, self.inter)
+        self.cpu = Cpu(self.cas, self.wram, self.ppu, self.inter)
+
+    # run the cpu until the ppu finishes a frame, the ppu catches up
+    # by itself (see Cpu.sync_ppu)
+    def run_frame(self):
+        frame = self.ppu.frame
+        while self.ppu.frame == frame:
+            self.cpu.run()
+        return self.ppu.image
+
+    # versioned binary snapshot, see pynes/state.py
+    def save_state(self):
+        return save_state(self)
+
+    def load_state(self, state):
+        load_state(self, state)
@@ -0,0 +1,262 @@
+# generated from opset.yaml by `python -m pynes.genopset`,
+# do not edit
+
+# opcode -> (op, mode, cycle, size), None: not implemented
+OPSET = (
+    ('BRK', 'IMPL', 7, 1),  # 0x00
+    ('ORA', 'IND_X', 6, 2),  # 0x01
+    ('NOP', 'IMPL', 2, 1),  # 0x02
+    ('SLO', 'IND_X', 8, 2),  # 0x03
+    ('NOPD', 'IMPL', 3, 1),  # 0x04
+    ('ORA', 'ZPG', 3, 2),  # 0x05
+    ('ASL', 'ZPG', 5, 2),  # 0x06
+    ('SLO', 'ZPG', 5, 2),  # 0x07
+    ('PHP', 'IMPL', 3, 1),  # 0x08
+    ('ORA', 'IMD', 2, 2),  # 0x09
+    ('ASL', 'ACM', 2, 1),  # 0x0A
+    None,  # 0x0B
+    ('NOPI', 'IMPL', 4, 1),  # 0x0C
+    ('ORA', 'ABS', 4, 3),  # 0x0D
+    ('ASL', 'ABS', 6, 3),  # 0x0E
+    ('SLO', 'ABS', 6, 3),  # 0x0F
+    ('BPL', 'REL', 2, 2),  # 0x10
+    ('ORA', 'IND_Y', 5, 2),  # 0x11
+    ('NOP', 'IMPL', 2, 1),  # 0x12
+    ('SLO', 'IND_Y', 8, 2),  # 0x13
+    ('NOPD', 'IMPL', 4, 1),  # 0x14
+    ('ORA', 'ZPG_X', 4, 2),  # 0x15
+    ('ASL', 'ZPG_X', 6, 2),  # 0x16
+    ('SLO', 'ZPG_X', 6, 2),  # 0x17
+    ('CLC', 'IMPL', 2, 1),  # 0x18
+    ('ORA', 'ABS_Y', 4, 3),  # 0x19
+    ('NOP', 'IMPL', 2, 1),  # 0x1A
+    ('SLO', 'ABS_Y', 7, 3),  # 0x1B
+    ('NOPI', 'IMPL', 4, 1),  # 0x1C
+    ('ORA', 'ABS_X', 4, 3),  # 0x1D
+    ('ASL', 'ABS_X', 6, 3),  # 0x1E
+    ('SLO', 'ABS_X', 7, 3),  # 0x1F
+    ('JSR', 'ABS', 6, 3),  # 0x20
+    ('AND', 'IND_X', 6, 2),  # 0x21
+    ('NOP', 'IMPL', 2, 1),  # 0x22
+    ('RLA', 'IND_X', 8, 2),  # 0x23
+    ('BIT', 'ZPG', 3, 2),  # 0x24
+    ('AND', 'ZPG', 3, 2),  # 0x25
+    ('ROL', 'ZPG', 5, 2),  # 0x26
+    ('RLA', 'ZPG', 5, 2),  # 0x27
+    ('PLP', 'IMPL', 4, 1),  # 0x28
+    ('AND', 'IMD', 2, 2),  # 0x29
+    ('ROL', 'ACM', 2, 1),  # 0x2A
+    None,  # 0x2B
+    ('BIT', 'ABS', 4, 3),  # 0x2C
+    ('AND', 'ABS', 4, 3),  # 0x2D
+    ('ROL', 'ABS', 6, 3),  # 0x2E
+    ('RLA', 'ABS', 6, 3),  # 0x2F
+    ('BMI', 'REL', 2, 2),  # 0x30
+    ('AND', 'IND_Y', 5, 2),  # 0x31
+    ('NOP', 'IMPL', 2, 1),  # 0x32
+    ('RLA', 'IND_Y', 8, 2),  # 0x33
+    ('NOPD', 'IMPL', 4, 1),  # 0x34
+    ('AND', 'ZPG_X', 4, 2),  # 0x35
+    ('ROL', 'ZPG_X', 6, 2),  # 0x36
+    ('RLA', 'ZPG_X', 6, 2),  # 0x37
+    ('SEC', 'IMPL', 2, 1),  # 0x38
+    ('AND', 'ABS_Y', 4, 3),  # 0x39
+    ('NOP', 'IMPL', 2, 1),  # 0x3A
+    ('RLA', 'ABS_Y', 7, 3),  # 0x3B
+    ('NOPI', 'IMPL', 4, 1),  # 0x3C
+    ('AND', 'ABS_X', 4, 3),  # 0x3D
+    ('ROL', 'ABS_X', 6, 3),  # 0x3E
+    ('RLA', 'ABS_X', 7, 3),  # 0x3F
+    ('RTI', 'IMPL', 6, 1),  # 0x40
+    ('EOR', 'IND_X', 6, 2),  # 0x41
+    ('NOP', 'IMPL', 2, 1),  # 0x42
+    ('SRE', 'IND_X', 8, 2),  # 0x43
+    ('NOPD', 'IMPL', 3, 1),  # 0x44
+    ('EOR', 'ZPG', 3, 2),  # 0x45
+    ('LSR', 'ZPG', 5, 2),  # 0x46
+    ('SRE', 'ZPG', 5, 2),  # 0x47
+    ('PHA', 'IMPL', 3, 1),  # 0x48
+    ('EOR', 'IMD', 2, 2),  # 0x49
+    ('LSR', 'ACM', 2, 1),  # 0x4A
+    None,  # 0x4B
+    ('JMP', 'ABS', 3, 3),  # 0x4C
+    ('EOR', 'ABS', 4, 3),  # 0x4D
+    ('LSR', 'ABS', 6, 3),  # 0x4E
+    ('SRE', 'ABS', 6, 3),  # 0x4F
+    ('BVC', 'REL', 2, 2),  # 0x50
+    ('EOR', 'IND_Y', 5, 2),  # 0x51
+    ('NOP', 'IMPL', 2, 1),  # 0x52
+    ('SRE', 'IND_Y', 8, 2),  # 0x53
+    ('NOPD', 'IMPL', 4, 1),  # 0x54
+    ('EOR', 'ZPG_X', 4, 2),  # 0x55
+    ('LSR', 'ZPG_X', 6, 2),  # 0x56
+    ('SRE', 'ZPG_X', 6, 2),  # 0x57
+    ('CLI', 'IMPL', 2, 1),  # 0x58
+    ('EOR', 'ABS_Y', 4, 3),  # 0x59
+    ('NOP', 'IMPL', 2, 1),  # 0x5A
+    ('SRE', 'ABS_Y', 7, 3),  # 0x5B
+    ('NOPI', 'IMPL', 4, 1),  # 0x5C
+    ('EOR', 'ABS_X', 4, 3),  # 0x5D
+    ('LSR', 'ABS_X', 6, 3),  # 0x5E
+    ('SRE', 'ABS_X', 7, 3),  # 0x5F
+    ('RTS', 'IMPL', 6, 1),  # 0x60
+    ('ADC', 'IND_X', 6, 2),  # 0x61
+    ('NOP', 'IMPL', 2, 1),  # 0x62
+    ('RRA', 'IND_X', 8, 2),  # 0x63
+    ('NOPD', 'IMPL', 3, 1),  # 0x64
+    ('ADC', 'ZPG', 3, 2),  # 0x65
+    ('ROR', 'ZPG', 5, 2),  # 0x66
+    ('RRA', 'ZPG', 5, 2),  # 0x67
+    ('PLA', 'IMPL', 4, 1),  # 0x68
+    ('ADC', 'IMD', 2, 2),  # 0x69
+    ('ROR', 'ACM', 2, 1),  # 0x6A
+    None,  # 0x6B
+    ('JMP', 'ABS_IND', 5, 3),  # 0x6C
+    ('ADC', 'ABS', 4, 3),  # 0x6D
+    ('ROR', 'ABS', 6, 3),  # 0x6E
+    ('RRA', 'ABS', 6, 3),  # 0x6F
+    ('BVS', 'REL', 2, 2),  # 0x70
+    ('ADC', 'IND_Y', 5, 2),  # 0x71
+    ('NOP', 'IMPL', 2, 1),  # 0x72
+    ('RRA', 'IND_Y', 8, 2),  # 0x73
+    ('NOPD', 'IMPL', 4, 1),  # 0x74
+    ('ADC', 'ZPG_X', 4, 2),  # 0x75
+    ('ROR', 'ZPG_X', 6, 2),  # 0x76
+    ('RRA', 'ZPG_X', 6, 2),  # 0x77
+    ('SEI', 'IMPL', 2, 1),  # 0x78
+    ('ADC', 'ABS_Y', 4, 3),  # 0x79
+    ('NOP', 'IMPL', 2, 1),  # 0x7A
+    ('RRA', 'ABS_Y', 7, 3),  # 0x7B
+    ('NOPI', 'IMPL', 4, 1),  # 0x7C
+    ('ADC', 'ABS_X', 4, 3),  # 0x7D
+    ('ROR', 'ABS_X', 6, 3),  # 0x7E
+    ('RRA', 'ABS_X', 7, 3),  # 0x7F
+    ('NOPD', 'IMPL', 2, 1),  # 0x80
+    ('STA', 'IND_X', 6, 2),  # 0x81
+    ('NOPD', 'IMPL', 2, 1),  # 0x82
+    ('SAX', 'IND_X', 6, 2),  # 0x83
+    ('STY', 'ZPG', 3, 2),  # 0x84
+    ('STA', 'ZPG', 3, 2),  # 0x85
+    ('STX', 'ZPG', 3, 2),  # 0x86
+    ('SAX', 'ZPG', 3, 2),  # 0x87
+    ('DEY', 'IMPL', 2, 1),  # 0x88
+    ('NOPD', 'IMPL', 2, 1),  # 0x89
+    ('TXA', 'IMPL', 2, 1),  # 0x8A
+    None,  # 0x8B
+    ('STY', 'ABS', 4, 3),  # 0x8C
+    ('STA', 'ABS', 4, 3),  # 0x8D
+    ('STX', 'ABS', 4, 3),  # 0x8E
+    ('SAX', 'ABS', 4, 3),  # 0x8F
+    ('BCC', 'REL', 2, 2),  # 0x90
+    ('STA', 'IND_Y', 6, 2),  # 0x91
+    ('NOP', 'IMPL', 2, 1),  # 0x92
+    None,  # 0x93
+    ('STY', 'ZPG_X', 4, 2),  # 0x94
+    ('STA', 'ZPG_X', 4, 2),  # 0x95
+    ('STX', 'ZPG_Y', 4, 2),  # 0x96
+    ('SAX', 'ZPG_Y', 4, 2),  # 0x97
+    ('TYA', 'IMPL', 2, 1),  # 0x98
+    ('STA', 'ABS_Y', 5, 3),  # 0x99
+    ('TXS', 'IMPL', 2, 1),  # 0x9A
+    None,  # 0x9B
+    None,  # 0x9C
+    ('STA', 'ABS_X', 4, 3),  # 0x9D
+    None,  # 0x9E
+    None,  # 0x9F
+    ('LDY', 'IMD', 2, 2),  # 0xA0
+    ('LDA', 'IND_X', 6, 2),  # 0xA1
+    ('LDX', 'IMD', 2, 2),  # 0xA2
+    ('LAX', 'IND_X', 6, 2),  # 0xA3
+    ('LDY', 'ZPG', 3, 2),  # 0xA4
+    ('LDA', 'ZPG', 3, 2),  # 0xA5
+    ('LDX', 'ZPG', 3, 2),  # 0xA6
+    ('LAX', 'ZPG', 3, 2),  # 0xA7
+    ('TAY', 'IMPL', 2, 1),  # 0xA8
+    ('LDA', 'IMD', 2, 2),  # 0xA9
+    ('TAX', 'IMPL', 2, 1),  # 0xAA
+    None,  # 0xAB
+    ('LDY', 'ABS', 4, 3),  # 0xAC
+    ('LDA', 'ABS', 4, 3),  # 0xAD
+    ('LDX', 'ABS', 4, 3),  # 0xAE
+    ('LAX', 'ABS', 4, 3),  # 0xAF
+    ('BCS', 'REL', 2, 2),  # 0xB0
+    ('LDA', 'IND_Y', 5, 2),  # 0xB1
+    ('NOP', 'IMPL', 2, 1),  # 0xB2
+    ('LAX', 'IND_Y', 5, 2),  # 0xB3
+    ('LDY', 'ZPG_X', 4, 2),  # 0xB4
+    ('LDA', 'ZPG_X', 4, 2),  # 0xB5
+    ('LDX', 'ZPG_Y', 4, 2),  # 0xB6
+    ('LAX', 'ZPG_Y', 4, 2),  # 0xB7
+    ('CLV', 'IMPL', 2, 1),  # 0xB8
+    ('LDA', 'ABS_Y', 4, 3),  # 0xB9
+    ('TSX', 'IMPL', 2, 1),  # 0xBA
+    None,  # 0xBB
+    ('LDY', 'ABS_X', 4, 3),  # 0xBC
+    ('LDA', 'ABS_X', 4, 3),  # 0xBD
+    ('LDX', 'ABS_Y', 4, 3),  # 0xBE
+    ('LAX', 'ABS_Y', 4, 3),  # 0xBF
+    ('CPY', 'IMD', 2, 2),  # 0xC0
+    ('CMP', 'IND_X', 6, 2),  # 0xC1
+    ('NOPD', 'IMPL', 2, 1),  # 0xC2
+    ('DCP', 'IND_X', 8, 2),  # 0xC3
+    ('CPY', 'ZPG', 3, 2),  # 0xC4
+    ('CMP', 'ZPG', 3, 2),  # 0xC5
+    ('DEC', 'ZPG', 5, 2),  # 0xC6
+    ('DCP', 'ZPG', 5, 2),  # 0xC7
+    ('INY', 'IMPL', 2, 1),  # 0xC8
+    ('CMP', 'IMD', 2, 2),  # 0xC9
+    ('DEX', 'IMPL', 2, 1),  # 0xCA
+    None,  # 0xCB
+    ('CPY', 'ABS', 4, 3),  # 0xCC
+    ('CMP', 'ABS', 4, 3),  # 0xCD
+    ('DEC', 'ABS', 6, 3),  # 0xCE
+    ('DCP', 'ABS', 6, 3),  # 0xCF
+    ('BNE', 'REL', 2, 2),  # 0xD0
+    ('CMP', 'IND_Y', 5, 2),  # 0xD1
+    ('NOP', 'IMPL', 2, 1),  # 0xD2
+    ('DCP', 'IND_Y', 8, 2),  # 0xD3
+    ('NOPD', 'IMPL', 4, 1),  # 0xD4
+    ('CMP', 'ZPG_X', 4, 2),  # 0xD5
+    ('DEC', 'ZPG_X', 6, 2),  # 0xD6
+    ('DCP', 'ZPG_X', 6, 2),  # 0xD7
+    ('CLD', 'IMPL', 2, 1),  # 0xD8
+    ('CMP', 'ABS_Y', 4, 3),  # 0xD9
+    ('NOP', 'IMPL', 2, 1),  # 0xDA
+    ('DCP', 'ABS_Y', 7, 3),  # 0xDB
+    ('NOPI', 'IMPL', 4, 1),  # 0xDC
+    ('CMP', 'ABS_X', 4, 3),  # 0xDD
+    ('DEC', 'ABS_X', 7, 3),  # 0xDE
+    ('DCP', 'ABS_X', 7, 3),  # 0xDF
+    ('CPX', 'IMD', 2, 2),  # 0xE0
+    ('SBC', 'IND_X', 6, 2),  # 0xE1
+    ('NOPD', 'IMPL', 3, 1),  # 0xE2
+    ('ISB', 'IND_X', 8, 2),  # 0xE3
+    ('CPX', 'ZPG', 3, 2),  # 0xE4
+    ('SBC', 'ZPG', 3, 2),  # 0xE5
+    ('INC', 'ZPG', 5, 2),  # 0xE6
+    ('ISB', 'ZPG', 5, 2),  # 0xE7
+    ('INX', 'IMPL', 2, 1),  # 0xE8
+    ('SBC', 'IMD', 2, 2),  # 0xE9
+    ('NOP', 'IMPL', 2, 1),  # 0xEA
+    ('SBC', 'IMD', 2, 2),  # 0xEB
+    ('CPX', 'ABS', 4, 3),  # 0xEC
+    ('SBC', 'ABS', 4, 3),  # 0xED
+    ('INC', 'ABS', 6, 3),  # 0xEE
+    ('ISB', 'ABS', 6, 3),  # 0xEF
+    ('BEQ', 'REL', 2, 2),  # 0xF0
+    ('SBC', 'IND_Y', 5, 2),  # 0xF1
+    ('NOP', 'IMPL', 2, 1),  # 0xF2
+    ('ISB', 'IND_Y', 8, 2),  # 0xF3
+    ('NOPD', 'IMPL', 4, 1),  # 0xF4
+    ('SBC', 'ZPG_X', 4, 2),  # 0xF5
+    ('INC', 'ZPG_X', 6, 2),  # 0xF6
+    ('ISB', 'ZPG_X', 6, 2),  # 0xF7
+    ('SED', 'IMPL', 2, 1),  # 0xF8
+    ('SBC', 'ABS_Y', 4, 3),  # 0xF9
+    ('NOP', 'IMPL', 2, 1),  # 0xFA
+    ('ISB', 'ABS_Y', 7, 3),  # 0xFB
+    ('NOPI', 'IMPL', 4, 1),  # 0xFC
+    ('SBC', 'ABS_X', 4, 3),  # 0xFD
+    ('INC', 'ABS_X', 7, 3),  # 0xFE
+    ('ISB', 'ABS_X', 7, 3),  # 0xFF
+)
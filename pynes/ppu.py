@@ -1,6 +1,7 @@
 from logging import raiseExceptions
 from numpy import int8
 from pynes import *
+from pynes.mapper import *
 from pynes.ram import *
 logger = PynesLogger.get_logger(__name__)
 
@@ -53,43 +54,81 @@ logger = PynesLogger.get_logger(__name__)
 
 PALETTE_SIZE = 0x20
 VRAM_SIZE = 0x0800
+# char ram of a cassette without char rom
+CHAR_RAM_SIZE = 0x2000
+# pattern tables are switched in 1KB slots of 64 tiles
+CHAR_BANK_SIZE = 0x0400
+CHAR_BANK_NUM = 8
 TILE_SIZE = 8
 H_SPRITE_NUM = 32
 V_SPRITE_NUM = 30
 V_SIZE_WITH_VBLANK = 262
 CYCLE_PER_LINE = 341
-
+SPRITE_NUM = SPRITE_RAM_SIZE // 4
+SPRITES_PER_LINE = 8
+# (line, cycle) of a sprite 0 hit never reached in a frame
+NO_SPRITE_HIT = (V_SIZE_WITH_VBLANK, 0)
+
+def decode_tiles(data):
+    '''
+        decode pattern table into (num of tiles, 8, 8) pixel patterns,
+        see Ppu.build_sprite_data for the bit planes
+    '''
+    planes = np.unpackbits(
+        np.frombuffer(data, dtype=np.uint8).reshape(-1, 2, 8, 1), axis=3)
+    return planes[:, 0] | (planes[:, 1] << 1)
+
+# sprites of every line of a frame, up to SPRITES_PER_LINE in OAM order,
+# evaluated line by line and overwritten every frame
 @dataclass
-class Sprite:
-    data: list[list[int]]
-    x: int = 0
-    y: int = 0
-    attr: int = 0
+class SpriteLines:
+    count: np.ndarray
+    # OAM index, x, attribute and the pixel pattern (flipped) of the line
+    index: np.ndarray
+    x: np.ndarray
+    attr: np.ndarray
+    data: np.ndarray
     def __init__(self):
-        self.data = np.zeros((8, 8), dtype=np.int8)
-
+        self.count = np.zeros(V_SIZE, dtype=np.uint8)
+        self.index = np.zeros((V_SIZE, SPRITES_PER_LINE), dtype=np.uint8)
+        self.x = np.zeros((V_SIZE, SPRITES_PER_LINE), dtype=np.uint8)
+        self.attr = np.zeros((V_SIZE, SPRITES_PER_LINE), dtype=np.uint8)
+        self.data = np.zeros((V_SIZE, SPRITES_PER_LINE, TILE_SIZE),
+            dtype=np.uint8)
+
+# background of a frame, allocated once and overwritten every frame
 @dataclass
-class Tile:
-    sprite: Sprite
-    palette_id: int = 0
-    scroll_x: int = 0
-    scroll_y: int = 0
-    sprite_id: int = 0
+class Background:
+    # index of Ppu.tiles and palette id of 2 name tables side by side,
+    # a row is built every 8 lines
+    tile_id: np.ndarray
+    palette_id: np.ndarray
+    # (x, y) scroll of every line, x includes the name table (0 - 511)
+    scroll: np.ndarray
+    rows: int = 0
     def __init__(self):
-        self.sprite = Sprite()
+        self.tile_id = np.zeros((V_SPRITE_NUM, H_SPRITE_NUM * 2),
+            dtype=np.uint16)
+        self.palette_id = np.zeros((V_SPRITE_NUM, H_SPRITE_NUM * 2),
+            dtype=np.uint8)
+        self.scroll = np.zeros((V_SIZE, 2), dtype=np.int16)
+        self.rows = 0
 
 @dataclass
 class Image:
-    sprite: list[Sprite] = field(default_factory=list)
-    background: list[Tile] = field(default_factory=list)
+    sprites: SpriteLines = field(default_factory=SpriteLines)
+    background: Background = field(default_factory=Background)
     palette: list[int] = field(default_factory=list)
 
+# x of the tiles in Background
+BACKGROUND_TILE_X = np.arange(H_SPRITE_NUM * 2)
+
 class Palette(Ram):
     def __init__(self, size):
         super().__init__(size)
 
     def read(self):
-        data = np.zeros(PALETTE_SIZE, dtype=np.int)
+        data = np.zeros(PALETTE_SIZE, dtype=np.uint8)
         for i, _ in enumerate(self.data):
             if self.is_sprite_mirror(i):
                 data[i] = self.data[i - 0x10]
@@ -143,13 +182,33 @@ class Ppu:
         self.creg2 = 0
         # status register 
         self.sreg = 0
-        self.sprites = []
-        self.background = []
+        self.sprites = SpriteLines()
+        self.background = Background()
+        self.vram_array = np.frombuffer(self.vram.data, dtype=np.uint8)
         self.palette = Palette(PALETTE_SIZE)
-        self.char_ram = Ram(cas.char_size)
-        for addr, data in enumerate(self.cas.char_rom):
-            self.char_ram.data[addr] = data
+        # pattern memory, a view of the char rom or the char ram of a
+        # cassette without char rom, the only one writable
+        self.char_ram = None if cas.char_size else Ram(CHAR_RAM_SIZE)
+        self.char_mem = self.char_ram.data if self.char_ram else cas.char_rom
+        # decoded char_mem, updated on char ram write
+        self.tiles = decode_tiles(self.char_mem)
+        # char_mem offset of the pattern table slots and tile of the
+        # pattern tables -> index of tiles, switched by the mapper
+        self.char_banks = [i * CHAR_BANK_SIZE for i in range(CHAR_BANK_NUM)]
+        self.tile_map = np.arange(CHAR_BANK_NUM * CHAR_BANK_SIZE // 16)
+        self.name_table_offsets = np.array(NAME_TABLE_OFFSETS[cas.mirroring])
+        self.mapper = cas.mapper
         self.sprite_ram = SpriteRam(SPRITE_RAM_SIZE)
+        # (y, tile, attr, x) of the sprites
+        self.oam = np.frombuffer(self.sprite_ram.data,
+            dtype=np.uint8).reshape(SPRITE_NUM, 4)
+        # sprites of every line bucketed by y, see get_sprite_index,
+        # None: OAM or the sprite size has changed
+        self.sprite_index = None
+        self.overflow_line = None
+        # (line, cycle) of the sprite 0 hit, see get_sprite_hit,
+        # None: the registers, OAM or the patterns have changed
+        self.sprite_hit = None
 
         self.cycle = 0
         self.line = 0
@@ -161,6 +220,13 @@ class Ppu:
         self.scroll_y = 0
         self.is_horizontal_scroll = True
         self.is_lower_vram_addr = False
+        # num of finished frames and the last image
+        self.frame = 0
+        self.image = None
+
+    # Control Register 1, Sprite size
+    def get_sprite_height(self):
+        return 16 if (self.creg1 & 0x20) else 8
 
     # Control Register 1, PPU memory increment
     def get_vram_offset(self):
@@ -190,6 +256,9 @@ class Ppu:
     def get_is_sprite_enable(self):
         return bool(self.creg2 & 0x10)
 
+    def get_is_rendering(self):
+        return bool(self.creg2 & 0x18)
+
     # PPU status register
     def set_sprite_hit(self):
         self.sreg |= 0x40
@@ -198,6 +267,14 @@ class Ppu:
     def clear_sprite_hit(self):
         self.sreg &= 0xBF
 
+    # PPU status register
+    def set_sprite_overflow(self):
+        self.sreg |= 0x20
+
+    # PPU status register
+    def clear_sprite_overflow(self):
+        self.sreg &= 0xDF
+
     # PPU status register
     def set_vblank(self):
         # print("set_vlank")
@@ -211,47 +288,108 @@ class Ppu:
     def clear_vblank(self):
         self.sreg &= 0x7F
 
-    def has_sprite_hit(self):
-        # main screen y
-        y = self.sprite_ram.read(0x00)
-        return ((y == self.line) and
-            self.get_is_background_enable() and
-            self.get_is_sprite_enable())
+    def get_sprite_hit(self):
+        '''
+            (line, cycle) where an opaque pixel of sprite 0 first
+            overlaps an opaque pixel of the background, NO_SPRITE_HIT
+            if it does not. cached until the registers, OAM or the
+            patterns change.
+        '''
+        if self.sprite_hit is None:
+            self.sprite_hit = self.find_sprite_hit()
+        return self.sprite_hit
+
+    def find_sprite_hit(self):
+        if not (self.get_is_background_enable() and
+                self.get_is_sprite_enable()):
+            return NO_SPRITE_HIT
+        height = self.get_sprite_height()
+        y, x = int(self.oam[0, 0]), int(self.oam[0, 3])
+        row = np.arange(height)
+        data = self.build_sprite_rows(self.oam[[0] * height], row, height)
+        line = (y + row)[:, None]
+        column = x + np.arange(TILE_SIZE)
+        # no hit at x = 255, nor in the left end unless both are shown
+        mask = (data > 0) & (line < V_SIZE) & (column < H_SIZE - 1)
+        if (self.creg2 & 0x06) != 0x06:
+            mask &= column >= TILE_SIZE
+        if not mask.any():
+            return NO_SPRITE_HIT
+        mask &= self.get_background_opaque(line % V_SIZE, column % H_SIZE)
+        hit = np.flatnonzero(mask)
+        if not len(hit):
+            return NO_SPRITE_HIT
+        row, col = divmod(int(hit[0]), TILE_SIZE)
+        return y + row, x + col + 1
+
+    # sets the sprite hit if it is on the current line before `cycle`
+    def check_sprite_hit(self, cycle):
+        if self.sreg & 0x40 or self.line >= V_SIZE:
+            return
+        line, hit_cycle = self.get_sprite_hit()
+        if line == self.line and hit_cycle <= cycle:
+            self.set_sprite_hit()
 
     def get_scroll_tile_x(self):
         return self.scroll_x + int(((self.get_name_table_id() % 2) * 256) / 8)
 
     def get_scroll_tile_y(self):
-        return self.scroll_y + int(((self.get_name_table_id() / 2) * 240) / 8)
+        return (self.scroll_y // TILE_SIZE +
+            (self.get_name_table_id() // 2) * V_SPRITE_NUM)
+
+    # scroll x in pixel including name table (0 - 511)
+    def get_scroll_x(self):
+        return self.scroll_x + (self.get_name_table_id() % 2) * H_SIZE
 
     def get_tile_y(self):
         return int(self.line / 8) + self.get_scroll_tile_y() - 1
 
+    # x, y: tile position in a name table (scalar or np.ndarray)
     def get_block_id(self, x, y):
-        return (int((x % 4) / 2) + int((y % 4) / 2)) * 2
+        return (x % 4) // 2 + ((y % 4) // 2) * 2
+
+    # name_table_id: scalar or np.ndarray
+    def get_name_table_offset(self, name_table_id):
+        return self.name_table_offsets[name_table_id]
+
+    def set_mirroring(self, mirroring):
+        self.name_table_offsets[:] = NAME_TABLE_OFFSETS[mirroring]
+        self.sprite_hit = None
+
+    # map char_mem[offset:offset + size] to the pattern tables at addr
+    def map_char(self, addr, size, offset):
+        for i in range(0, size, CHAR_BANK_SIZE):
+            start = (offset + i) % len(self.char_mem)
+            slot = (addr + i) // CHAR_BANK_SIZE
+            self.char_banks[slot] = start
+            tile = start >> 4
+            self.tile_map[slot * 64:(slot + 1) * 64] = \
+                np.arange(tile, tile + 64)
+        self.sprite_hit = None
+
+    # pattern table addr -> char_mem offset
+    def get_char_addr(self, addr):
+        return self.char_banks[addr >> 10] + (addr & 0x03FF)
 
     # read from name_table
     def get_sprite_id(self, x, y, offset):
         tile_num = y * 32 + x
         sprite_addr = tile_num + offset
         # print(sprite_addr, tile_num, offset)
-        data = self.vram.data[sprite_addr]
-        return data
+        return self.vram_array[sprite_addr]
 
     def get_attribute(self, x, y, offset):
-        addr = int(x / 4) + int(y / 4) * 8 + 0x03C0 + offset
-        # TODO
-        # return self.vram->read(self.mirror_down_sprite_addr(addr))
-        return self.vram.data[addr]
+        addr = x // 4 + (y // 4) * 8 + 0x03C0 + offset
+        return self.vram_array[addr]
 
     def get_palette(self):
         return self.palette.read()
 
+    # 0x3000-0x3EFF is a mirror of 0x2000, name tables are mirrored
+    # as get_name_table_offset
     def calc_vram_addr(self):
-        if (self.vram_addr >= 0x3000 and self.vram_addr < 0x3F00):
-            return self.vram_addr - 0x3000
-        else:
-            return self.vram_addr - 0x2000
+        addr = (self.vram_addr - 0x2000) & 0x0FFF
+        return int(self.name_table_offsets[addr >> 10]) + (addr & 0x03FF)
 
     # read by cpu
     def vram_read(self):
@@ -266,7 +404,8 @@ class Ppu:
                 return self.vram.data[addr]
         else:
             # pattern table from charactor rom
-            self.vram_buf = self.char_ram.data[self.vram_addr]
+            addr = self.get_char_addr(self.vram_addr)
+            self.vram_buf = self.char_mem[addr]
             self.vram_addr += self.get_vram_offset()
             # dprint("addr %p %d", self.vram_addr, self.vram_buf)
         return buf
@@ -303,7 +442,17 @@ class Ppu:
     def write_sprite_ram_data(self, data):
         # print("addr:", self.sprite_ram_addr, "data:", hex(data))    
         self.sprite_ram.write(self.sprite_ram_addr, data)
-        self.sprite_ram_addr += 1
+        self.sprite_ram_addr = (self.sprite_ram_addr + 1) & 0xFF
+        self.sprite_index = None
+
+    # SPRITE_RAM_SIZE bytes from sprite_ram_addr, which wraps around
+    # and ends where it started
+    def write_sprite_ram_dma(self, data):
+        addr = self.sprite_ram_addr
+        self.sprite_ram.data[addr:] = data[:SPRITE_RAM_SIZE - addr]
+        self.sprite_ram.data[:addr] = data[SPRITE_RAM_SIZE - addr:]
+        self.sprite_index = None
+        self.sprite_hit = None
 
     def write_scroll_data(self, data):
         if self.is_horizontal_scroll:
@@ -336,14 +485,19 @@ class Ppu:
                 # name table, attr table
                 # print(f"[vram write] addr:{self.calc_vram_addr()}, {data}")
                 self.vram.data[self.calc_vram_addr()] = data
-        else:
-            # pattern table from charactor rom
+        elif self.char_ram is not None:
+            # pattern table of char ram, char rom ignores writes
             # print(f"[pattern write] addr:{hex(self.vram_addr)}, {hex(data)}")
-            self.char_ram.data[self.vram_addr] = data
+            addr = self.get_char_addr(self.vram_addr)
+            self.char_ram.data[addr] = data
+            self.update_tile(addr >> 4)
         self.vram_addr += self.get_vram_offset()
 
     # write by cpu
     def write(self, addr, data):
+        if addr != 0x0003 and addr != 0x0006:
+            # may move the sprite 0 hit
+            self.sprite_hit = None
         if addr == 0x0000:
             # logger.info(f"addr:{addr} data:{data}")
             self.creg1 = data
@@ -375,6 +529,10 @@ class Ppu:
             # logger.info(f"[NotImplement] addr:{addr} data:{data}")
             raise NotImplementedError
 
+    def update_tile(self, tile_id):
+        addr = tile_id * 16
+        self.tiles[tile_id] = decode_tiles(self.char_mem[addr:addr + 16])[0]
+
     # vector<vector<> 
     def build_sprite_data(self, sprite_id, offset):
         '''
@@ -400,93 +558,187 @@ class Ppu:
 
             see https:#wiki.nesdev.com/w/index.php/PPU_pattern_tables
         '''
-        sprite = np.zeros((8, 8), dtype=np.int)
-        for i in range(0, 16):
-            addr = sprite_id * 16 + i + offset
-            ram = self.char_ram.data[addr]
-
-            for j in range(0, 8):
-                if ram & (0x80 >> j):
-                    sprite[i % 8][j] += 0x01 << int(i/8)
-        return sprite
-
-    def build_sprites(self):
-        # see https:#wiki.nesdev.com/w/index.php/PPU_OAM
-        for i in range(0, self.sprite_ram_addr, 4):
-            sprite = Sprite()
-            sprite.y = self.sprite_ram.read(i)
-            sprite_id = self.sprite_ram.read(i + 1)
-            sprite.attr = self.sprite_ram.read(i + 2)
-            sprite.x = self.sprite_ram.read(i + 3)
-            sprite.data = \
-                self.build_sprite_data(sprite_id, self.get_sprite_table_offset())
-            if not (sprite.x == 0 and sprite.y == 0 and
-                    sprite_id == 0 and sprite.attr == 0):
-                print(f"[{i}][{sprite_id}](x, y) = ({sprite.x}, {sprite.y})\n"
-                    f"{sprite.data}")
-                self.sprites.append(sprite)
-
-    # the element of background
-    def build_tile(self, x, y, offset):
-        tile = Tile()
-        block_id = self.get_block_id(x, y)
-        sprite_id = self.get_sprite_id(x, y, offset)
-        attr = self.get_attribute(x, y, offset)
-        tile.sprite_id = sprite_id
-        tile.palette_id = (attr >> (block_id * 2)) & 0x03
-        tile.sprite.data = self.build_sprite_data(sprite_id, 
-                self.get_background_table_offset())
-        tile.scroll_x = self.scroll_x
-        tile.scroll_y = self.scroll_y
-        return tile
+        return self.tiles[self.tile_map[sprite_id + (offset >> 4)]]
+
+    def build_sprite_index(self):
+        '''
+            OAM indexes of every line in OAM order, bucketed by line:
+            the sprites of line y are ids[starts[y]:starts[y + 1]].
+            rebuilt when OAM or the sprite size changes.
+        '''
+        height = self.get_sprite_height()
+        lines = (self.oam[:, 0, None].astype(np.intp) +
+            np.arange(height)).ravel()
+        ids = np.repeat(np.arange(SPRITE_NUM), height)
+        visible = lines < V_SIZE
+        lines, ids = lines[visible], ids[visible]
+        order = np.argsort(lines, kind="stable")
+        starts = np.searchsorted(lines[order], np.arange(V_SIZE + 1))
+        counts = np.diff(starts)
+        overflow = np.flatnonzero(counts > SPRITES_PER_LINE)
+        # first line with too many sprites, see get_next_event
+        self.overflow_line = int(overflow[0]) if len(overflow) else None
+        self.sprite_index = (height, starts.tolist(), ids[order])
+
+    def get_sprite_index(self):
+        if (self.sprite_index is None or
+                self.sprite_index[0] != self.get_sprite_height()):
+            self.build_sprite_index()
+        return self.sprite_index
+
+    # sprites of a line, see https:#wiki.nesdev.com/w/index.php/PPU_OAM
+    def evaluate_sprites(self, line):
+        sprites = self.sprites
+        sprites.count[line] = 0
+        if not self.get_is_rendering():
+            return
+        height, starts, ids = self.get_sprite_index()
+        start, end = starts[line], starts[line + 1]
+        if start == end:
+            return
+        if end - start > SPRITES_PER_LINE:
+            self.set_sprite_overflow()
+            end = start + SPRITES_PER_LINE
+        if not self.get_is_sprite_enable():
+            return
+
+        index = ids[start:end]
+        oam = self.oam[index]
+        data = self.build_sprite_rows(oam,
+            line - oam[:, 0].astype(np.intp), height)
+        count = len(index)
+        sprites.count[line] = count
+        sprites.index[line, :count] = index
+        sprites.x[line, :count] = oam[:, 3]
+        sprites.attr[line, :count] = oam[:, 2]
+        sprites.data[line, :count] = data
+
+    # pixel patterns (flipped) of `row` (0 - height - 1) of the sprites
+    # of OAM entries `oam`
+    def build_sprite_rows(self, oam, row, height):
+        attr = oam[:, 2]
+        tile = oam[:, 1].astype(np.intp)
+        # vertical reverse
+        row = np.where(attr & 0x80, height - 1 - row, row)
+        if height == 16:
+            # bit 0 selects the pattern table, the lower tile is the next
+            tile = ((tile & 0x01) << 8) + (tile & 0xFE) + (row >> 3)
+            row &= 0x07
+        else:
+            tile += self.get_sprite_table_offset() >> 4
+        data = self.tiles[self.tile_map[tile], row]
+        # horizontal reverse
+        return np.where((attr & 0x40)[:, None] > 0, data[:, ::-1], data)
 
     # draw every 8 line
     def build_background(self):
-        mod_y = self.get_tile_y() % V_SPRITE_NUM
-        table_id_offset = \
-            2 if int((self.get_tile_y() / V_SPRITE_NUM) % 2) else 0
-
-        for x in range(0, H_SPRITE_NUM):
-            # tile_x = (x + self.get_scroll_tile_x())
-            mod_x = x % H_SPRITE_NUM
-            name_table_id = int(x / H_SPRITE_NUM) % 2 + table_id_offset
-            offset_addr_by_name_table = name_table_id * 0x0400
-            tile = self.build_tile(mod_x, mod_y, offset_addr_by_name_table)
-            self.background.append(tile)
-
+        tile_y = self.get_tile_y()
+        mod_y = tile_y % V_SPRITE_NUM
+        table_id_offset = 2 if (tile_y // V_SPRITE_NUM) % 2 else 0
+
+        x = BACKGROUND_TILE_X
+        mod_x = x % H_SPRITE_NUM
+        name_table_id = x // H_SPRITE_NUM + table_id_offset
+        offset = self.get_name_table_offset(name_table_id)
+        attr = self.get_attribute(mod_x, mod_y, offset)
+        palette_id = (attr >> (self.get_block_id(mod_x, mod_y) * 2)) & 0x03
+        tile_id = self.tile_map[self.get_sprite_id(mod_x, mod_y, offset) +
+            (self.get_background_table_offset() >> 4)]
+
+        row = self.background.rows
+        self.background.tile_id[row] = tile_id
+        self.background.palette_id[row] = palette_id
+        self.background.rows += 1
+
+    # opaque pixels of the background at (line, column) as rendered,
+    # np.ndarray of screen coordinates, see build_background
+    def get_background_opaque(self, line, column):
+        x = (self.get_scroll_x() + column) % (H_SIZE * 2)
+        y = line + self.scroll_y
+        tile_x = x // TILE_SIZE
+        tile_y = (y // TILE_SIZE +
+            (self.get_name_table_id() // 2) * V_SPRITE_NUM)
+        table_id_offset = np.where((tile_y // V_SPRITE_NUM) % 2, 2, 0)
+        offset = self.get_name_table_offset(
+            tile_x // H_SPRITE_NUM + table_id_offset)
+        tile_id = self.tile_map[self.get_sprite_id(tile_x % H_SPRITE_NUM,
+            tile_y % V_SPRITE_NUM, offset) +
+            (self.get_background_table_offset() >> 4)]
+        return self.tiles[tile_id, y % TILE_SIZE, x % TILE_SIZE] > 0
+
+    # cpu cycles until the next line observable without accessing the
+    # registers (sprite hit, sprite overflow, mapper irq, vblank, end of
+    # frame)
+    def get_next_event(self):
+        line = V_SIZE + 1 if self.line <= V_SIZE else V_SIZE_WITH_VBLANK
+        # a line is evaluated at the start of the next one, see run_line
+        if not (self.sreg & 0x20) and self.get_is_rendering():
+            self.get_sprite_index()
+            if (self.overflow_line is not None and
+                    self.line <= self.overflow_line < line - 1):
+                line = self.overflow_line + 1
+        # the mapper is clocked on every rendered line, see run_line
+        clocks = self.mapper.get_irq_clocks()
+        if (clocks is not None and self.get_is_rendering() and
+                self.line + clocks < min(line, V_SIZE + 1)):
+            line = self.line + clocks
+        cycle = (line - self.line) * CYCLE_PER_LINE - self.cycle
+        # sprite 0 hit in the middle of a line
+        if not (self.sreg & 0x40) and self.line < V_SIZE:
+            hit_line, hit_cycle = self.get_sprite_hit()
+            hit = ((hit_line - self.line) * CYCLE_PER_LINE + hit_cycle -
+                self.cycle)
+            if 0 < hit < cycle:
+                cycle = hit
+        return max(0, -(-cycle // 3))
+
+    # catch up `cycle` cpu cycles, returns the image at the end of a frame
     def run(self, cycle):
         self.cycle += 3 * cycle
-        
+
         if self.line == 0:
-            self.background.clear()
-            self.sprites.clear()
-        if self.cycle >= CYCLE_PER_LINE:
+            self.background.rows = 0
+            self.background.scroll[0] = (self.get_scroll_x(), self.scroll_y)
+        while self.cycle >= CYCLE_PER_LINE:
+            self.check_sprite_hit(CYCLE_PER_LINE)
             self.cycle -= CYCLE_PER_LINE
-            self.line += 1
-
-            if self.has_sprite_hit():
-                self.set_sprite_hit()
-            if self.line <= V_SIZE and \
-                not (self.line % TILE_SIZE) and \
-                    (self.line % TILE_SIZE == 0):
-                self.build_background()
-            
-            if self.line == V_SIZE + 1:
-                self.set_vblank()
-                self.interrupts.deassert_nmi()
-                if self.has_vblank_irq_enabled():
-                    self.interrupts.assert_nmi()
-            
-            if self.line == V_SIZE_WITH_VBLANK:
-                self.build_sprites()
-                self.clear_vblank()
-                self.clear_sprite_hit()
-                self.line = 0
-
-                self.image = {}
-                self.image["sprites"] = self.sprites
-                self.image["background"] = self.background
-                self.image["palette"] = self.get_palette()
-                self.interrupts.deassert_nmi()
-                return self.image
-        return None
\ No newline at end of file
+            if (image := self.run_line()) is not None:
+                return image
+        self.check_sprite_hit(self.cycle)
+        return None
+
+    def run_line(self):
+        self.line += 1
+        if self.line < V_SIZE:
+            self.background.scroll[self.line] = \
+                (self.get_scroll_x(), self.scroll_y)
+
+        if self.line <= V_SIZE:
+            self.evaluate_sprites(self.line - 1)
+        if self.line <= V_SIZE and not (self.line % TILE_SIZE):
+            self.build_background()
+        if ((self.line <= V_SIZE or self.line == V_SIZE_WITH_VBLANK) and
+                self.get_is_rendering()):
+            self.mapper.clock_line()
+
+        if self.line == V_SIZE + 1:
+            self.set_vblank()
+            self.interrupts.deassert_nmi()
+            if self.has_vblank_irq_enabled():
+                self.interrupts.assert_nmi()
+
+        if self.line == V_SIZE_WITH_VBLANK:
+            self.clear_vblank()
+            self.clear_sprite_hit()
+            self.clear_sprite_overflow()
+            self.line = 0
+            self.frame += 1
+
+            self.image = {}
+            self.image["sprites"] = self.sprites
+            self.image["background"] = self.background
+            self.image["tiles"] = self.tiles
+            self.image["palette"] = self.get_palette()
+            self.interrupts.deassert_nmi()
+            return self.image
+        return None
@@ -1,6 +1,10 @@
 from pynes import *
 logger = PynesLogger.get_logger(__name__)
 
+# digest of a memory (bytearray)
+def hash_ram(data):
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
 class Ram:
     def __init__(self, size):
         self.size = size
@@ -1,4 +1,5 @@
 from pynes import *
+from pynes.ppu import *
 from pynes.ram import *
 logger = PynesLogger.get_logger(__name__)
 
@@ -21,80 +22,73 @@ COLORS = [
     0x99FFFC, 0xDDDDDD, 0x111111, 0x111111
 ]
 
+COLOR_TABLE = np.array(COLORS, dtype=np.uint32)
+
+# digest of a rendered frame (Renderer.get_render_result)
+def hash_frame(data):
+    return hashlib.blake2b(data.tobytes(), digest_size=8).hexdigest()
+
 class Renderer:
     def __init__(self):
-        self.data = np.zeros((V_SIZE, H_SIZE), dtype=np.int)
+        self.data = np.zeros((V_SIZE, H_SIZE), dtype=np.uint32)
+        # pixel pattern (0-3) of background, 0 is transparent
+        self.background = np.zeros((V_SIZE, H_SIZE), dtype=np.uint8)
 
     def render(self, image):
         self.image = image
-        if not image["background"] == None:
+        if image["background"] is not None:
             self.render_background()
-        if not image["sprites"] == None:
+        if image["sprites"] is not None:
             self.render_sprites()
     
     def get_render_result(self):
         return self.data
     
-    def should_pixel_hide(self, x, y):
-        tile_x = int(x/8)
-        tile_y = int(y/8)
-        index = tile_y * 32 + tile_x
-        data = self.image["background"][index].sprite.data
-        return int((data[y % 8][x % 8] % 4) > 0)
+    def get_colors(self, palette_index):
+        return COLOR_TABLE[self.image["palette"][palette_index] & 0x3F]
 
     def render_background(self):
-        for i, tile in enumerate(self.image["background"]):
-            x = (i % 32) * 8
-            y = int(i / 32) * 8
-            self.render_tile(tile, x, y, self.image["palette"])
+        background = self.image["background"]
+        rows = background.rows
+        if rows == 0:
+            return
+        tiles = self.image["tiles"]
 
-        # Path("hoge.txt").unlink()
-        # with Path("hoge.txt").open("a") as f:
-        #     for y in range(0, H_SIZE):
-        #         for x in range(0, V_SIZE):
-        #             log = f"{x} {y} {self.data[y][x]} {id(self.data[y][x])}\n"
-        #             f.write(log)
+        # (rows, 64, 8, 8) -> (rows, 8, 64, 8) -> (rows * 8, 512)
+        def to_plane(tile_data):
+            return tile_data.transpose(0, 2, 1, 3) \
+                .reshape(rows * 8, H_SIZE * 2)
+        data = tiles[background.tile_id[:rows]]
+        palette_id = background.palette_id[:rows, :, None, None]
+        pattern = to_plane(data)
+        palette_index = to_plane(data + palette_id * 4)
 
-    def render_tile(self, tile, tile_x, tile_y, palette):
-        offset_x = tile.scroll_x % 8
-        offset_y = tile.scroll_y % 8
+        # scroll of every line, fine y and x including the name table
+        lines = min(rows * 8, V_SIZE)
+        scroll = background.scroll[:lines].astype(np.int64)
+        src_y = (np.arange(lines) + scroll[:, 1] % 8) % (rows * 8)
+        src_x = (np.arange(H_SIZE) + scroll[:, 0, None]) % (H_SIZE * 2)
+        area = (src_y[:, None], src_x)
 
-        # print(len(self.data), len(self.data[0]))
-        for i in range(0, 8):
-            for j in range(0, 8):
-                palette_index = tile.palette_id * 4 + tile.sprite.data[i][j]
-                color_id = palette[palette_index]
-                x = tile_x + j - offset_x
-                y = tile_y + i - offset_y
-                if (tile_x <= x < tile_x + 8 and
-                        tile_y <= y < tile_y + 8):
-                    # print(f"(x, y) = ({x}, {y})")
-                    self.data[y][x] = COLORS[color_id]
-                else:
-                    print(f"{tile_x} <= {x} < {tile_x + 7} and {tile_y} <= {y} < {tile_y + 7}")
-                    raise NotImplementedError
+        self.background[:lines] = pattern[area]
+        self.data[:lines] = self.get_colors(palette_index[area])
 
     def render_sprites(self):
-        for sprite in self.image["sprites"]:
-            self.render_sprite(sprite)
-
-    # write on background(tile), 8*8
-    def render_sprite(self, sprite):
-        palette = self.image["palette"]
-
-        is_vertical_reverse = bool(sprite.attr & 0x80)
-        is_horizontal_reverse =  bool(sprite.attr & 0x40)
-        is_low_priority =  bool(sprite.attr & 0x20)
-        palette_id = sprite.attr & 0x03
-
-        # print(sprite)
-        for i in range(0, 8):
-            for j in range(0, 8):
-                x = sprite.x + ((7 - j) if is_horizontal_reverse else j)
-                y = sprite.y + ((7 - i) if is_vertical_reverse else i)
-                if is_low_priority and self.should_pixel_hide(x, y):
-                    continue
-
-                if sprite.data[i][j] > 0:
-                    color_id = palette[palette_id * 4 + sprite.data[i][j] + 0x10]
-                    self.data[y % V_SIZE][x % H_SIZE] = COLORS[color_id]
\ No newline at end of file
+        sprites = self.image["sprites"]
+        x = np.arange(TILE_SIZE)
+        # the lower slot (OAM index) is in front
+        for slot in reversed(range(SPRITES_PER_LINE)):
+            lines = np.flatnonzero(sprites.count > slot)
+            if not len(lines):
+                continue
+            attr = sprites.attr[lines, slot, None]
+            data = sprites.data[lines, slot]
+            # clipped at the right end
+            columns = sprites.x[lines, slot, None].astype(np.intp) + x
+            mask = (data > 0) & (columns < H_SIZE)
+            columns %= H_SIZE
+            area = (lines[:, None], columns)
+            # low priority, behind the background
+            mask &= ((attr & 0x20) == 0) | (self.background[area] == 0)
+            colors = self.get_colors((attr & 0x03) * 4 + data + 0x10)
+            self.data[area] = np.where(mask, colors, self.data[area])
@@ -0,0 +1,130 @@
+from pynes import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [Rewind Buffer]
+    a snapshot (Nes.save_state) is taken every `interval` frames.
+    a keyframe is stored compressed as is, the following snapshots are
+    stored as the compressed xor of the keyframe, a new keyframe starts
+    every `keyframe_interval` snapshots. pad buttons of every frame are
+    kept to replay the frames between snapshots.
+    the oldest keyframe and its deltas are dropped beyond `size` bytes.
+'''
+
+REWIND_SIZE = 32 * 1024 * 1024
+REWIND_INTERVAL = 4
+REWIND_KEYFRAME_INTERVAL = 16
+REWIND_COMPRESS_LEVEL = 1
+
+def xor_state(state, key):
+    return np.bitwise_xor(np.frombuffer(state, dtype=np.uint8),
+        np.frombuffer(key, dtype=np.uint8)).tobytes()
+
+@dataclass
+class Keyframe:
+    frame: int
+    data: bytes
+    # (frame, data) of the deltas
+    deltas: list = field(default_factory=list)
+
+    def get_size(self):
+        return len(self.data) + sum(len(data) for _, data in self.deltas)
+
+    def get_last_frame(self):
+        return self.deltas[-1][0] if self.deltas else self.frame
+
+class Rewind:
+    def __init__(self, nes, size = REWIND_SIZE, interval = REWIND_INTERVAL,
+            keyframe_interval = REWIND_KEYFRAME_INTERVAL):
+        self.nes = nes
+        self.size = size
+        self.interval = interval
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = deque()
+        # frame -> (pad1, pad2) buttons
+        self.pads = {}
+        # uncompressed state of the last keyframe
+        self.key = None
+        self.used = 0
+
+    # capture the frame and run it
+    def run_frame(self):
+        self.capture()
+        return self.nes.run_frame()
+
+    def capture(self):
+        frame = self.nes.ppu.frame
+        cpu = self.nes.cpu
+        self.pads[frame] = (cpu.pad1.get_buttons(), cpu.pad2.get_buttons())
+        if frame % self.interval:
+            return
+        if self.keyframes and self.keyframes[-1].get_last_frame() >= frame:
+            return
+
+        state = self.nes.save_state()
+        if (self.key is None or len(self.key) != len(state) or
+                len(self.keyframes[-1].deltas) + 1 >= self.keyframe_interval):
+            self.key = state
+            keyframe = Keyframe(frame,
+                zlib.compress(state, REWIND_COMPRESS_LEVEL))
+            self.keyframes.append(keyframe)
+            self.used += len(keyframe.data)
+        else:
+            delta = zlib.compress(xor_state(state, self.key),
+                REWIND_COMPRESS_LEVEL)
+            self.keyframes[-1].deltas.append((frame, delta))
+            self.used += len(delta)
+        self.evict()
+
+    def evict(self):
+        while self.used > self.size and len(self.keyframes) > 1:
+            self.used -= self.keyframes.popleft().get_size()
+        oldest = self.get_oldest_frame()
+        for frame in [f for f in self.pads if f < oldest]:
+            del self.pads[frame]
+
+    def get_oldest_frame(self):
+        return self.keyframes[0].frame if self.keyframes else 0
+
+    # latest (frame, state) at or before `frame`
+    def find(self, frame):
+        for keyframe in reversed(self.keyframes):
+            if keyframe.frame > frame:
+                continue
+            key = zlib.decompress(keyframe.data)
+            for frame_, delta in reversed(keyframe.deltas):
+                if frame_ <= frame:
+                    return frame_, xor_state(zlib.decompress(delta), key)
+            return keyframe.frame, key
+        return None
+
+    # back to the start of `frame`, newer history is discarded
+    def restore(self, frame):
+        assert frame <= self.nes.ppu.frame, f"future frame: {frame}"
+        found = self.find(frame)
+        assert found is not None, f"not in the rewind buffer: {frame}"
+        frame_, state = found
+
+        cpu = self.nes.cpu
+        self.nes.load_state(state)
+        for f in range(frame_, frame + 1):
+            buttons = self.pads.get(f)
+            if buttons is not None:
+                cpu.pad1.set_buttons(buttons[0])
+                cpu.pad2.set_buttons(buttons[1])
+            if f < frame:
+                self.nes.run_frame()
+        self.truncate(frame)
+
+    def truncate(self, frame):
+        while self.keyframes and self.keyframes[-1].frame > frame:
+            self.used -= self.keyframes.pop().get_size()
+        if self.keyframes:
+            deltas = self.keyframes[-1].deltas
+            while deltas and deltas[-1][0] > frame:
+                self.used -= len(deltas.pop()[1])
+            self.key = zlib.decompress(self.keyframes[-1].data)
+        else:
+            self.key = None
+        for f in [f for f in self.pads if f > frame]:
+            del self.pads[f]
@@ -0,0 +1,116 @@
+from pynes import *
+from pynes.cpu import *
+from pynes.ppu import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [Save State]
+    | item      | description                                    |
+    +-----------+------------------------------------------------+
+    | header    | magic, version, total size                     |
+    | registers | STATE_REGS, cpu, pads, ppu and interrupts      |
+    | mapper    | Mapper.get_state, fixed size by the mapper     |
+    | buffers   | get_buffers in order, raw bytes                |
+'''
+
+STATE_MAGIC = b"PYNS"
+STATE_VERSION = 4
+STATE_HEADER = struct.Struct("<4sHI")
+STATE_REGS = struct.Struct(
+    # cpu: A, X, Y, P, SP, PC, cycle, op_index, ppu_synced, ppu_deadline
+    "<BBBBHHQQQQ"
+    # pad1, pad2: buttons, count, io_reg
+    "HBBHBB"
+    # ppu: creg1, creg2, sreg, cycle, line, vram_buf, vram_addr,
+    # sprite_ram_addr, scroll_x, scroll_y, is_horizontal_scroll,
+    # is_lower_vram_addr, frame, background.rows
+    "BBBHHBIHBB??QB"
+    # interrupts: nmi, irq
+    "??")
+
+# buttons and the strobe switch (bit 8)
+def get_pad_state(pad):
+    return pad.get_buttons() | (pad.switch << 8), pad.count, pad.io_reg
+
+def set_pad_state(pad, buttons, count, io_reg):
+    pad.set_buttons(buttons)
+    pad.switch = bool(buttons & 0x100)
+    pad.count, pad.io_reg = count, io_reg
+
+# writable buffers of a machine, bytearray or np.ndarray
+def get_buffers(nes):
+    ppu = nes.ppu
+    buffers = [
+        nes.cpu.ram.data,
+        nes.cpu.exram.data,
+        ppu.vram.data,
+        ppu.palette.data,
+        ppu.sprite_ram.data,
+        ppu.background.tile_id,
+        ppu.background.palette_id,
+        ppu.background.scroll,
+        ppu.sprites.count,
+        ppu.sprites.index,
+        ppu.sprites.x,
+        ppu.sprites.attr,
+        ppu.sprites.data,
+    ]
+    if ppu.char_ram is not None:
+        buffers.append(ppu.char_ram.data)
+    return buffers
+
+def save_state(nes):
+    cpu, ppu, reg = nes.cpu, nes.ppu, nes.cpu.reg
+    regs = STATE_REGS.pack(
+        reg.A, reg.X, reg.Y, reg.P, reg.SP, reg.PC,
+        cpu.cycle, cpu.op_index, cpu.ppu_synced, cpu.ppu_deadline,
+        *get_pad_state(cpu.pad1), *get_pad_state(cpu.pad2),
+        ppu.creg1, ppu.creg2, ppu.sreg, ppu.cycle, ppu.line,
+        ppu.vram_buf, ppu.vram_addr, ppu.sprite_ram_addr,
+        ppu.scroll_x, ppu.scroll_y,
+        ppu.is_horizontal_scroll, ppu.is_lower_vram_addr,
+        ppu.frame, ppu.background.rows,
+        nes.inter.nmi, nes.inter.irq)
+    mapper = nes.cas.mapper.get_state()
+    buffers = [memoryview(buf).cast("B") for buf in get_buffers(nes)]
+    size = (STATE_HEADER.size + len(regs) + len(mapper) +
+        sum(len(buf) for buf in buffers))
+    header = STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, size)
+    return b"".join([header, regs, mapper, *buffers])
+
+def load_state(nes, state):
+    magic, version, size = STATE_HEADER.unpack_from(state)
+    assert magic == STATE_MAGIC, "not a save state"
+    assert version == STATE_VERSION, f"unsupported version: {version}"
+    assert size == len(state), f"invalid size: {len(state)}"
+
+    cpu, ppu, reg = nes.cpu, nes.ppu, nes.cpu.reg
+    offset = STATE_HEADER.size
+    regs = STATE_REGS.unpack_from(state, offset)
+    offset += STATE_REGS.size
+    (reg.A, reg.X, reg.Y, reg.P, reg.SP, reg.PC,
+        cpu.cycle, cpu.op_index, cpu.ppu_synced, cpu.ppu_deadline) = regs[:10]
+    set_pad_state(cpu.pad1, *regs[10:13])
+    set_pad_state(cpu.pad2, *regs[13:16])
+    (ppu.creg1, ppu.creg2, ppu.sreg, ppu.cycle, ppu.line,
+        ppu.vram_buf, ppu.vram_addr, ppu.sprite_ram_addr,
+        ppu.scroll_x, ppu.scroll_y,
+        ppu.is_horizontal_scroll, ppu.is_lower_vram_addr,
+        ppu.frame, ppu.background.rows) = regs[16:30]
+    nes.inter.nmi, nes.inter.irq = regs[30:]
+    # remaps the banks
+    mapper = nes.cas.mapper
+    size = len(mapper.get_state())
+    mapper.set_state(state[offset:offset + size])
+    offset += size
+
+    # copied in place, views of the buffers (Ppu.vram_array) stay valid
+    for buf in get_buffers(nes):
+        view = memoryview(buf).cast("B")
+        view[:] = state[offset:offset + len(view)]
+        offset += len(view)
+    if ppu.char_ram is not None:
+        ppu.tiles[:] = decode_tiles(ppu.char_ram.data)
+    ppu.sprite_index = None
+    ppu.sprite_hit = None
+    cpu.idle = None
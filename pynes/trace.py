@@ -0,0 +1,166 @@
+from pynes import *
+logger = PynesLogger.get_logger(__name__)
+
+'''
+    [Trace Record]
+    | field   | type   | description                           |
+    +---------+--------+---------------------------------------+
+    | i       | uint32 | instruction number (1-origin)         |
+    | pc      | uint16 | program counter                       |
+    | op      | uint8  | Opcode value, 0: unknown              |
+    | mode    | uint8  | Addrmode value, 0: unknown            |
+    | data    | int32  | operand, -1: unknown                  |
+    | A, X, Y | uint8  | registers                             |
+    | P       | uint8  | status register                       |
+    | SP      | uint16 | stack pointer                         |
+    | line    | uint16 | ppu line                              |
+    | p_cycle | uint16 | ppu cycle                             |
+    | c_cycle | uint64 | cpu cycle                             |
+'''
+
+TRACE_MAGIC = b"PYNT"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<4sHH")
+TRACE_RECORD = struct.Struct("<IHBBiBBBBHHHQ")
+TRACE_FIELDS = ("i", "pc", "op", "mode", "data", "A", "X", "Y", "P", "SP",
+    "line", "p_cycle", "c_cycle")
+TRACE_RING_SIZE = 0x400
+
+class TraceMode(Enum):
+    OFF = auto()
+    RING = auto()
+    FULL = auto()
+
+def write_header(f):
+    f.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, TRACE_RECORD.size))
+
+def check_header(buf, path):
+    magic, version, size = TRACE_HEADER.unpack_from(buf)
+    assert magic == TRACE_MAGIC, f"not a trace file: {path}"
+    assert version == TRACE_VERSION, f"unsupported version: {version}"
+    assert size == TRACE_RECORD.size, f"invalid record size: {size}"
+
+# compare the check items (i ... SP), skipping unknown items of the log
+def match_record(sample, correct):
+    i, pc, op, mode, data, A, X, Y, P, SP = sample[:10]
+    i_, pc_, op_, mode_, data_, A_, X_, Y_, P_, SP_ = correct[:10]
+    if not (SP_ & 0xFF00):
+        SP &= 0xFF
+    return ((i, pc, A, X, Y, P, SP) == (i_, pc_, A_, X_, Y_, P_, SP_) and
+        (op_ == 0 or op == op_) and
+        (mode_ == 0 or mode == mode_) and
+        (data_ < 0 or data == data_))
+
+# keeps the last `size` records in a preallocated buffer
+class RingTrace:
+    def __init__(self, size = TRACE_RING_SIZE):
+        self.size = size
+        self.buf = bytearray(size * TRACE_RECORD.size)
+        self.count = 0
+
+    def record(self, *rec):
+        TRACE_RECORD.pack_into(self.buf,
+            (self.count % self.size) * TRACE_RECORD.size, *rec)
+        self.count += 1
+
+    # n-th record (0-origin) if still in the buffer
+    def get(self, n):
+        if not (max(0, self.count - self.size) <= n < self.count):
+            return None
+        return TRACE_RECORD.unpack_from(self.buf,
+            (n % self.size) * TRACE_RECORD.size)
+
+    def last(self, num):
+        start = max(0, self.count - min(num, self.size))
+        return [self.get(n) for n in range(start, self.count)]
+
+    def close(self):
+        pass
+
+# streams every record to disk, keeps the last ones for crash dumps
+class FileTrace(RingTrace):
+    def __init__(self, path, size = TRACE_RING_SIZE):
+        super().__init__(size)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        self.file = self.path.open("wb")
+        write_header(self.file)
+
+    def record(self, *rec):
+        super().record(*rec)
+        self.file.write(TRACE_RECORD.pack(*rec))
+
+    def close(self):
+        self.file.close()
+
+def create_trace(mode, size = TRACE_RING_SIZE, path = None):
+    if mode == TraceMode.OFF:
+        return None
+    elif mode == TraceMode.RING:
+        return RingTrace(size)
+    elif mode == TraceMode.FULL:
+        return FileTrace(path, size)
+    else:
+        raise NotImplementedError
+
+def read_trace(path):
+    with Path(path).open("rb") as f:
+        check_header(f.read(TRACE_HEADER.size), path)
+        while rec := f.read(TRACE_RECORD.size):
+            yield TRACE_RECORD.unpack(rec)
+
+# golden log converted by convert_log, records are read through mmap
+class GoldenTrace:
+    def __init__(self, path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        check_header(self.buf, self.path)
+        self.count = (len(self.buf) - TRACE_HEADER.size) // TRACE_RECORD.size
+
+    def get(self, n):
+        if not (0 <= n < self.count):
+            return None
+        return TRACE_RECORD.unpack_from(self.buf,
+            TRACE_HEADER.size + n * TRACE_RECORD.size)
+
+    def close(self):
+        self.buf.close()
+
+# yield the items (flat mappings of int or str) of a yaml log one by one
+def iter_log(path):
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with Path(path).open() as f:
+        item, key = None, None
+        for event in yaml.parse(f, Loader = loader):
+            if isinstance(event, yaml.MappingStartEvent):
+                item = {}
+            elif isinstance(event, yaml.MappingEndEvent):
+                yield item
+            elif isinstance(event, yaml.ScalarEvent):
+                value = event.value
+                # plain style is None or '' depending on the loader
+                if not event.style and value.lstrip("-").isdigit():
+                    value = int(value)
+                if key is None:
+                    key = value
+                else:
+                    item[key] = value
+                    key = None
+
+# convert yaml log to trace file once, `encode` makes a record from an item
+def convert_log(src, encode, dst = None):
+    src = Path(src)
+    dst = src.with_suffix(".trace") if dst is None else Path(dst)
+    if dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime:
+        return dst
+    tmp = dst.with_suffix(".tmp")
+    try:
+        with tmp.open("wb") as f:
+            write_header(f)
+            for stat in iter_log(src):
+                f.write(TRACE_RECORD.pack(*encode(stat)))
+        tmp.replace(dst)
+    finally:
+        tmp.unlink(missing_ok = True)
+    return dst
@@ -6,29 +6,87 @@ logger = PynesLogger.get_logger(__name__)
 
 PAD_DELAY = 10
 PAD_INTERVAL = 10
-class Video:
-    def __init__(self, cpu):
+
+# shows frames from Renderer (uint32 0xRRGGBB, (V_SIZE, H_SIZE))
+class Presenter:
+    def update(self, data):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+# discards frames, no display needed
+class HeadlessVideo(Presenter):
+    def __init__(self):
+        self.count = 0
+
+    def update(self, data):
+        self.count += 1
+
+# writes frames to `path`
+#   png: frame_000000.png, frame_000001.png, ...
+#   raw: frames.raw, uint32 little endian 0x00RRGGBB, V_SIZE * H_SIZE a frame
+class FileVideo(Presenter):
+    def __init__(self, path, fmt = "png"):
+        self.path = Path(path)
+        self.path.mkdir(parents = True, exist_ok = True)
+        self.fmt = fmt
+        self.count = 0
+        if fmt == "png":
+            self.frame = pygame.Surface((H_SIZE, V_SIZE), depth=32)
+        elif fmt == "raw":
+            self.file = (self.path / "frames.raw").open("wb")
+        else:
+            raise NotImplementedError
+
+    def update(self, data):
+        if self.fmt == "png":
+            pygame.surfarray.blit_array(self.frame, data.T)
+            pygame.image.save(self.frame,
+                str(self.path / f"frame_{self.count:06d}.png"))
+        else:
+            self.file.write(np.ascontiguousarray(data, dtype="<u4").tobytes())
+        self.count += 1
+
+    def close(self):
+        if self.fmt == "raw":
+            self.file.close()
+
+def create_video(kind, cpu, scale = 1, path = "sample/frames"):
+    if kind == "window":
+        return Video(cpu, scale)
+    elif kind == "headless":
+        return HeadlessVideo()
+    elif kind in ["png", "raw"]:
+        return FileVideo(path, kind)
+    else:
+        raise NotImplementedError
+
+# pygame window, also reads pad input
+class Video(Presenter):
+    def __init__(self, cpu, scale = 1):
         pygame.init()
 
         self.cpu = cpu
-        self.surface = pygame.display.set_mode((H_SIZE, V_SIZE))
+        self.scale = scale
+        self.surface = pygame.display.set_mode(
+            (H_SIZE * scale, V_SIZE * scale))
 
         pygame.display.set_caption("pynes")
-        self.pixel = pygame.PixelArray(self.surface)
+        # frame in 0xRRGGBB, scaled to the window on update
+        self.frame = pygame.Surface((H_SIZE, V_SIZE), depth=32)
 
         # get pad input every 1 frame (60fps)
         pygame.key.set_repeat(PAD_DELAY, PAD_INTERVAL)
 
     def update(self, data):
-        self.surface.fill((0, 0, 0))
-        try:
-            for x in range(0, H_SIZE):
-                for y in range(0, V_SIZE):
-                    self.pixel[x][y] = int(data[y][x])
-
-        except:
-            print("error", x, y, data[y][x], type(data[y][x]))
-            raise NotImplementedError
+        # data is (V_SIZE, H_SIZE), surfarray is (x, y)
+        pygame.surfarray.blit_array(self.frame, data.T)
+        if self.scale == 1:
+            self.surface.blit(self.frame, (0, 0))
+        else:
+            pygame.transform.scale(
+                self.frame, self.surface.get_size(), self.surface)
 
         pygame.display.update()
         for event in pygame.event.get():
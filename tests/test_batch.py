@@ -0,0 +1,38 @@
+import pytest
+from pynes.batch import *
+
+def test_run_job():
+    result = run_job(Job("rom/hello.nes", 3))
+    assert result.error == ""
+    assert result.frames == 3
+    assert len(result.frame_hashes) == 3
+    assert result.ram_digest
+
+    result = run_job(Job("rom/not_exists.nes", 3))
+    assert "FileNotFoundError" in result.error
+    assert result.frames == 0
+
+def test_run_batch(tmp_path):
+    jobs = [Job("rom/nestest.nes", 2), Job("rom/hello.nes", 2),
+        Job("rom/hello.nes", 2)]
+    results = run_batch(jobs, processes = 2)
+    assert [r.rom for r in results] == [job.rom for job in jobs]
+    assert results[1].frame_hashes == results[2].frame_hashes
+    assert results[0].frame_hashes != results[1].frame_hashes
+
+    path = tmp_path / "report.yaml"
+    write_report(results, path)
+    report = yaml.safe_load(path.read_text())
+    assert report[0]["rom"] == "rom/nestest.nes"
+    assert report[0]["frame_hashes"] == results[0].frame_hashes
+
+def test_run_movie_job(tmp_path):
+    movie = Movie()
+    for frame in range(4):
+        movie.append(0x08 if frame == 2 else 0)
+    path = tmp_path / "start.movie"
+    movie.save(path)
+    result = run_job(Job("rom/nestest.nes", 4, str(path)))
+    assert result.error == ""
+    assert result.movie == str(path)
+    assert result.frames == 4
@@ -0,0 +1,39 @@
+import pytest
+from pynes.bus import *
+
+def test_map_mirror():
+    bus = Bus()
+    ram = bytearray(0x0800)
+    bus.map(0x0000, 0x2000, ram)
+    bus.write(0x0801, 0x12)
+    assert ram[0x0001] == 0x12
+    assert bus.read(0x1801) == 0x12
+
+def test_map_read_only():
+    bus = Bus()
+    rom = bytes(range(0x100)) * 0x40
+    bus.map(0x8000, 0x8000, rom)
+    assert bus.read(0x80FF) == 0xFF
+    # 16KB mirrored
+    assert bus.read(0xC010) == bus.read(0x8010) == 0x10
+    with pytest.raises(NotImplementedError):
+        bus.write(0x8000, 0x00)
+
+def test_map_io():
+    bus = Bus()
+    log = []
+    bus.map_io(0x2000, 0x2000, lambda addr: addr & 0x07,
+        lambda addr, data: log.append((addr, data)))
+    assert bus.read(0x3FFA) == 0x02
+    bus.write(0x2001, 0x1E)
+    assert log == [(0x2001, 0x1E)]
+    with pytest.raises(NotImplementedError):
+        bus.read(0x5000)
+
+def test_read_page():
+    bus = Bus()
+    ram = bytearray(range(0x100)) * 8
+    bus.map(0x0000, 0x2000, ram)
+    assert bus.read_page(0x19) == ram[0x100:0x200]
+    bus.map_io(0x2000, 0x2000, lambda addr: addr & 0x07, None)
+    assert bus.read_page(0x20) == bytes(range(8)) * 0x20
@@ -12,7 +12,7 @@ def hello_cpu():
     inter = Interrupts()
     ppu = Ppu(hello_cas, vram, inter)
     cpu = Cpu(hello_cas, wram, ppu, inter)
-    cpu.load_correct_log("log/hello.yaml")
+    cpu.load_correct_log("test_log/hello.yaml", verify = True)
     return cpu
 
 @pytest.fixture
@@ -24,7 +24,7 @@ def nestest_cpu(limit = 8991):
     ppu = Ppu(cas, vram, inter)
     cpu = Cpu(cas, wram, ppu, inter)
     cpu.reset_addr(0xc000)
-    cpu.load_correct_log(f"log/nestest{limit}.yaml")
+    cpu.load_correct_log("test_log/nestest.yaml", verify = True)
     return cpu
 
 @pytest.mark.parametrize(("reg", "val"), [
@@ -37,6 +37,50 @@ def nestest_cpu(limit = 8991):
 def test_init_value(hello_cpu, reg, val):
     assert vars(hello_cpu.reg)[reg] == val
 
+def test_optable(hello_cpu):
+    for opcode, opset in enumerate(OPSET):
+        if opset is None:
+            continue
+        inst = hello_cpu.optable[opcode]
+        assert (inst.op.name, inst.mode.name, inst.cycle, inst.size) == opset
+    # not in opset.yaml
+    with pytest.raises(NotImplementedError):
+        hello_cpu.optable[0x0B].resolve()
+
+def test_trace(hello_cpu, tmp_path):
+    hello_cpu.set_trace(TraceMode.OFF)
+    hello_cpu.run()
+    assert hello_cpu.get_dump(1) == []
+
+    hello_cpu.set_trace(TraceMode.RING, size = 4)
+    for _ in range(10):
+        hello_cpu.run()
+    dump = hello_cpu.get_dump(10)
+    assert [stat["i"] for stat in dump] == [8, 9, 10, 11]
+
+    path = tmp_path / "trace.bin"
+    hello_cpu.set_trace(TraceMode.FULL, size = 4, path = path)
+    for _ in range(10):
+        hello_cpu.run()
+    dump = hello_cpu.get_dump(4)
+    hello_cpu.set_trace(TraceMode.OFF)
+    recs = [get_stat(rec) for rec in read_trace(path)]
+    assert [stat["i"] for stat in recs] == list(range(12, 22))
+    assert recs[-4:] == dump
+
+def test_golden_trace(hello_cpu):
+    path = Path("test_log/hello.trace")
+    assert path.exists()
+    assert hello_cpu.correct.count == 200
+    assert get_stat(hello_cpu.correct.get(0))["opset"] == "SEI"
+
+    # fail fast on the first divergence
+    hello_cpu.reg.X = 0x01
+    with pytest.raises(AssertionError):
+        for _ in range(200):
+            hello_cpu.run()
+    assert hello_cpu.op_index < 10
+
 def test_status(hello_cpu):
     # compare with correct register status
     for _ in range(200):
@@ -49,9 +93,22 @@ def test_nestest(nestest_cpu, limit = 8991):
             cpu.run()
         except NotImplementedError:
             print(traceback.format_exc())
-            print(f"{cpu.dump[-1]['opset']}, "
-            f"{cpu.dump[-1]['mode']}",
+            stat = cpu.get_dump(1)[0]
+            print(f"{stat['opset']}, "
+            f"{stat['mode']}",
                 tag = "NotImplementedYet",
                 tag_color = "yellow",
                 color = "yellow")
-            break
\ No newline at end of file
+            break
+@pytest.mark.parametrize(("result", "flags"), [
+    (0x00, FLAG_ZERO),
+    (0x80, FLAG_NEGATIVE),
+    (0x100, FLAG_ZERO),
+    (0x7F, 0),
+])
+def test_status_flags(hello_cpu, result, flags):
+    cpu = hello_cpu
+    assert cpu.reg.P == STATUS_INIT
+    cpu.reg.P |= FLAG_CARRY | FLAG_ZERO | FLAG_NEGATIVE
+    cpu.set_flag_for_after_calc(result)
+    assert cpu.reg.P == STATUS_INIT | FLAG_CARRY | flags
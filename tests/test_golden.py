@@ -0,0 +1,16 @@
+import pytest
+from pynes.golden import *
+
+@pytest.mark.parametrize("rom", ["rom/hello.nes", "rom/nestest.nes"])
+def test_golden_frames(rom):
+    golden = load_golden(get_golden_path(rom))
+    result = run_job(get_golden_job(rom, golden))
+    assert compare_golden(golden, result) == []
+
+def test_golden_mismatch():
+    rom = "rom/hello.nes"
+    golden = load_golden(get_golden_path(rom))
+    result = run_job(get_golden_job(rom, golden))
+    result.frame_hashes[3] = "0000000000000000"
+    assert compare_golden(golden, result) == \
+        [f"{rom}: frame_hashes differ from frame 3"]
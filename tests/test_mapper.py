@@ -0,0 +1,202 @@
+import pytest
+from pynes.nes import *
+
+def make_rom(path, mapper, prog_num, char_num, flags6 = 0x00,
+        trainer = b""):
+    '''
+        every 8KB of the prog rom and every 1KB of the char rom is
+        filled with its index
+    '''
+    header = NES_MAGIC + bytes([prog_num, char_num,
+        ((mapper & 0x0F) << 4) | flags6, mapper & 0xF0]) + bytes(8)
+    prog = b"".join(bytes([i]) * 0x2000 for i in range(prog_num * 2))
+    char = b"".join(bytes([i]) * 0x0400 for i in range(char_num * 8))
+    path.write_bytes(header + trainer + prog + char)
+    return Nes(path)
+
+# 5 serial writes of an MMC1 register
+def write_mmc1(nes, addr, data):
+    for i in range(5):
+        nes.cpu.write(addr, (data >> i) & 0x01)
+
+def read_char(nes, addr):
+    ppu = nes.ppu
+    return ppu.char_mem[ppu.get_char_addr(addr)]
+
+def test_header(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 3, 1, 1, 0x07,
+        trainer = bytes([0xAB]) * TRAINER_SIZE)
+    cas = nes.cas
+    assert cas.mapper_id == 3
+    assert cas.mirroring == Mirroring.VERTICAL
+    assert cas.has_battery
+    assert nes.cpu.bread(0x7000) == nes.cpu.bread(0x71FF) == 0xAB
+    # the trainer is skipped
+    assert nes.cpu.bread(0x8000) == 0x00
+    # views of the mapped file
+    assert cas.prog_rom.readonly and cas.prog_rom.obj is cas.mmap
+    assert cas.char_rom.obj is cas.mmap
+
+    with pytest.raises(NotImplementedError):
+        make_rom(tmp_path / "b.nes", 0x99, 1, 1)
+
+def test_mirroring():
+    nes = Nes("rom/nestest.nes")
+    ppu = nes.ppu
+    assert nes.cas.mirroring == Mirroring.HORIZONTAL
+    # 0x2400 is a mirror of 0x2000, 0x2800 is the second name table
+    ppu.vram_addr = 0x2405
+    assert ppu.calc_vram_addr() == 0x0005
+    ppu.vram_addr = 0x2C05
+    assert ppu.calc_vram_addr() == 0x0405
+    ppu.set_mirroring(Mirroring.VERTICAL)
+    assert ppu.calc_vram_addr() == 0x0405
+    ppu.vram_addr = 0x3405
+    assert ppu.calc_vram_addr() == 0x0405
+
+def test_nrom_write(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 0, 1, 1)
+    assert nes.cpu.bread(0xC000) == nes.cpu.bread(0x8000) == 0
+    with pytest.raises(NotImplementedError):
+        nes.cpu.write(0x8000, 0x01)
+
+def test_mmc1(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 1, 8, 4)
+    # power on: switchable 0x8000, last bank fixed at 0xC000
+    assert nes.cpu.bread(0x8000) == 0
+    assert nes.cpu.bread(0xC000) == 14
+    write_mmc1(nes, 0xE000, 3)
+    assert nes.cpu.bread(0x8000) == 6
+    assert nes.cpu.bread(0xA000) == 7
+
+    # 32KB mode, 4KB char banks, horizontal
+    write_mmc1(nes, 0x8000, 0x13)
+    assert nes.cpu.bread(0x8000) == 4
+    assert nes.cpu.bread(0xC000) == 6
+    assert nes.ppu.name_table_offsets.tolist() == \
+        list(NAME_TABLE_OFFSETS[Mirroring.HORIZONTAL])
+    write_mmc1(nes, 0xA000, 3)
+    write_mmc1(nes, 0xC000, 5)
+    assert read_char(nes, 0x0000) == 12
+    assert read_char(nes, 0x1C00) == 23
+    assert nes.ppu.tile_map[0x100] == 20 * 64
+
+    # bit 7 resets the shift register
+    nes.cpu.write(0xE000, 0x01)
+    nes.cpu.write(0xE000, 0x80)
+    write_mmc1(nes, 0xE000, 1)
+    assert nes.cpu.bread(0x8000) == 2
+
+def test_uxrom(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 2, 4, 0)
+    assert nes.cpu.bread(0xC000) == 6
+    nes.cpu.write(0x8000, 0x02)
+    assert nes.cpu.bread(0x8000) == 4
+    assert nes.cpu.bread(0xFFFF) == 7
+
+    # char ram
+    ppu = nes.ppu
+    ppu.vram_addr = 0x0010
+    ppu.write_vram_data(0xFF)
+    assert ppu.tiles[1][0].tolist() == [1] * 8
+
+def test_cnrom(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 3, 1, 4)
+    nes.cpu.write(0x8000, 0x02)
+    assert read_char(nes, 0x0000) == 16
+    assert read_char(nes, 0x1FFF) == 23
+    # the background and sprites use the mapped tiles
+    assert (nes.ppu.build_sprite_data(0, 0x1000) ==
+        nes.ppu.tiles[20 * 64]).all()
+
+def test_mmc3(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 4, 4, 4)
+    cpu = nes.cpu
+    assert cpu.bread(0xC000) == 6
+    assert cpu.bread(0xE000) == 7
+    for bank, data in enumerate([2, 4, 8, 9, 10, 11, 3, 1]):
+        cpu.write(0x8000, bank)
+        cpu.write(0x8001, data)
+    assert [cpu.bread(addr) for addr in range(0x8000, 0x10000, 0x2000)] == \
+        [3, 1, 6, 7]
+    assert [read_char(nes, addr) for addr in range(0, 0x2000, 0x0400)] == \
+        [2, 3, 4, 5, 8, 9, 10, 11]
+
+    # prog mode 1 and char inversion
+    cpu.write(0x8000, 0xC0)
+    assert [cpu.bread(addr) for addr in range(0x8000, 0x10000, 0x2000)] == \
+        [6, 1, 3, 7]
+    assert [read_char(nes, addr) for addr in range(0, 0x2000, 0x0400)] == \
+        [8, 9, 10, 11, 2, 3, 4, 5]
+
+    cpu.write(0xA000, 0x01)
+    assert nes.ppu.name_table_offsets.tolist() == \
+        list(NAME_TABLE_OFFSETS[Mirroring.HORIZONTAL])
+
+def test_mmc3_blocks(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 4, 4, 4)
+    cpu = nes.cpu
+    cpu.set_block_cache(True)
+    # ORA ($01,X) in bank 1 at 0x8000 and 0xA000, ASL $06 at 0xC000
+    for bank in (6, 7):
+        cpu.write(0x8000, bank)
+        cpu.write(0x8001, 1)
+    for pc in (0x8000, 0x9FF0, 0xA000, 0xC000):
+        cpu.blocks[pc] = cpu.translate_block(pc)
+    blocks = dict(cpu.blocks)
+    assert blocks[0x9FF0][-1][-1] > 0xA000
+
+    # only the blocks overlapping 0xA000-0xBFFF are dropped
+    cpu.write(0x8000, 7)
+    cpu.write(0x8001, 2)
+    assert cpu.blocks == {pc: blocks[pc] for pc in (0x8000, 0xC000)}
+    assert cpu.translate_block(0xA000) != blocks[0xA000]
+
+def test_blocks_end(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 0, 1, 1)
+    cpu = nes.cpu
+    # ORA ($01,X) up to 0xFFFF, blocks stop at the end of the address space
+    block = cpu.translate_block(0xFFF0)
+    assert len(block) == 8 and block[-1][-1] == 0x10000
+    assert cpu.translate_block(0xFFFF) is None
+
+def test_mmc3_irq(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 4, 2, 1)
+    cpu, ppu = nes.cpu, nes.ppu
+    ppu.creg2 = 0x18
+    # no sprite overflow on the way
+    ppu.write_sprite_ram_dma(bytes([0xFF]) * SPRITE_RAM_SIZE)
+    cpu.write(0xC000, 10)
+    cpu.write(0xC001, 0)
+    cpu.write(0xE001, 0)
+    line = ppu.line
+    # reloaded on the first line, 0 after 10 more
+    assert cpu.ppu_deadline == cpu.cycle + ppu.get_next_event()
+    assert ppu.get_next_event() == \
+        -(-((11 * CYCLE_PER_LINE) - ppu.cycle) // 3)
+    ppu.run(ppu.get_next_event() - 1)
+    assert ppu.line == line + 10
+    assert not nes.inter.irq
+    ppu.run(1)
+    assert nes.inter.irq
+
+    # acknowledged, the counter is reloaded without an irq
+    cpu.write(0xE000, 0)
+    assert not nes.inter.irq
+    ppu.run(CYCLE_PER_LINE)
+    assert not nes.inter.irq
+
+def test_mapper_state(tmp_path):
+    nes = make_rom(tmp_path / "a.nes", 4, 4, 4)
+    cpu = nes.cpu
+    state = nes.save_state()
+    cpu.write(0x8000, 0x06)
+    cpu.write(0x8001, 0x05)
+    assert cpu.bread(0x8000) == 5
+    nes.load_state(state)
+    assert cpu.bread(0x8000) == 0
+    cpu.write(0x8000, 0x06)
+    cpu.write(0x8001, 0x05)
+    nes_ = Nes(nes.cas.path)
+    nes_.load_state(nes.save_state())
+    assert nes_.cpu.bread(0x8000) == 5
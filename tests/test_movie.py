@@ -0,0 +1,39 @@
+import pytest
+from pynes.movie import *
+from pynes.nes import *
+
+def test_movie_file(tmp_path):
+    movie = Movie()
+    movie.append(0x01)
+    movie.append(0x80, 0x02)
+    path = tmp_path / "input.movie"
+    movie.save(path)
+    assert path.stat().st_size == MOVIE_HEADER.size + 4
+
+    movie = Movie.load(path)
+    assert len(movie) == 2
+    assert movie.get(1) == (0x80, 0x02)
+    assert movie.get(2) == (0, 0)
+
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(AssertionError):
+        Movie.load(path)
+
+def test_record_play():
+    nes = Nes("rom/nestest.nes")
+    recorder = MovieRecorder(nes)
+    states = []
+    for frame in range(20):
+        # down, then start on the nestest menu
+        buttons = {10: 0x20, 15: 0x08}.get(frame, 0)
+        nes.cpu.pad1.set_buttons(buttons)
+        recorder.run_frame()
+        states.append(nes.save_state())
+    assert len(recorder.movie) == 20
+
+    nes_ = Nes("rom/nestest.nes")
+    player = MoviePlayer(nes_, Movie(recorder.movie.data))
+    for state in states:
+        player.run_frame()
+        assert nes_.save_state() == state
+    assert player.is_end()
@@ -0,0 +1,140 @@
+import pytest
+from pynes.nes import *
+
+def test_run_frame():
+    nes = Nes("rom/hello.nes")
+    image = nes.run_frame()
+    assert image is not None
+    assert nes.ppu.frame == 1
+    # the ppu is only behind the cpu until the next event
+    cycle = nes.cpu.cycle
+    assert nes.cpu.ppu_synced <= cycle < nes.cpu.ppu_deadline
+    assert nes.run_frame() is nes.ppu.image
+    assert nes.ppu.frame == 2
+
+@pytest.mark.parametrize("rom", ["rom/hello.nes", "rom/nestest.nes"])
+def test_block_cache(rom):
+    nes, nes_ = Nes(rom), Nes(rom)
+    nes_.cpu.set_block_cache(True)
+    for _ in range(3):
+        nes.run_frame()
+        nes_.run_frame()
+    assert nes_.cpu.blocks
+    assert nes_.cpu.cycle == nes.cpu.cycle
+    assert nes_.cpu.op_index == nes.cpu.op_index
+    assert vars(nes_.cpu.reg) == vars(nes.cpu.reg)
+    assert nes_.wram.data == nes.wram.data
+    assert nes_.vram.data == nes.vram.data
+
+    # flushed on remap
+    nes_.cpu.map_memory()
+    assert nes_.cpu.blocks == {}
+
+@pytest.mark.parametrize("rom", ["rom/hello.nes", "rom/nestest.nes"])
+def test_idle_skip(rom):
+    nes, nes_ = Nes(rom), Nes(rom)
+    nes.cpu.idle_skip = False
+    for _ in range(3):
+        nes.run_frame()
+        nes_.run_frame()
+    assert nes_.cpu.cycle == nes.cpu.cycle
+    assert nes_.cpu.op_index == nes.cpu.op_index
+    assert vars(nes_.cpu.reg) == vars(nes.cpu.reg)
+    assert nes_.wram.data == nes.wram.data
+    assert nes_.ppu.sreg == nes.ppu.sreg
+
+# ext ram (0x60) is outside of wram
+@pytest.mark.parametrize("page", [0x02, 0x0F, 0x60])
+def test_sprite_dma(page):
+    nes = Nes("rom/hello.nes")
+    cpu = nes.cpu
+    for i in range(SPRITE_RAM_SIZE):
+        cpu.write((page << 8) + i, i)
+    # LDA #page, STA $4014
+    for i, data in enumerate([0xA9, page, 0x8D, 0x14, 0x40]):
+        cpu.write(0x0500 + i, data)
+    cpu.reg.PC = 0x0500
+    nes.ppu.write(0x0003, 0x04)
+    cycle = cpu.cycle
+    cpu.run()
+    cpu.run()
+    # starts at OAMADDR and wraps around
+    assert nes.ppu.sprite_ram.data == bytes(range(252, 256)) + bytes(range(252))
+    assert nes.ppu.sprite_ram_addr == 0x04
+    assert cpu.cycle - cycle == 2 + 4 + 513 + ((cycle + 2) & 1)
+
+# NROM polling PPUSTATUS with nmi off: vblank, then the sprite 0 hit of
+# the opaque tile 1 at (0x40, 0x30), counting both in 0x00 and 0x01
+POLLING_PROG = bytes([
+    0xA9, 0x00,         # LDA #$00
+    0x8D, 0x00, 0x20,   # STA $2000
+    0x8D, 0x03, 0x20,   # STA $2003
+    0xA9, 0x30,         # LDA #$30
+    0x8D, 0x04, 0x20,   # STA $2004
+    0xA9, 0x01,         # LDA #$01
+    0x8D, 0x04, 0x20,   # STA $2004
+    0xA9, 0x00,         # LDA #$00
+    0x8D, 0x04, 0x20,   # STA $2004
+    0xA9, 0x40,         # LDA #$40
+    0x8D, 0x04, 0x20,   # STA $2004
+    0xA9, 0x20,         # LDA #$20
+    0x8D, 0x06, 0x20,   # STA $2006
+    0xA9, 0xC8,         # LDA #$C8
+    0x8D, 0x06, 0x20,   # STA $2006
+    0xA9, 0x01,         # LDA #$01
+    0x8D, 0x07, 0x20,   # STA $2007
+    0xA9, 0x1E,         # LDA #$1E
+    0x8D, 0x01, 0x20,   # STA $2001
+    0x2C, 0x02, 0x20,   # 0x8030: BIT $2002
+    0x10, 0xFB,         # BPL $8030
+    0xE6, 0x01,         # INC $01
+    0x2C, 0x02, 0x20,   # 0x8037: BIT $2002
+    0x70, 0xFB,         # BVS $8037
+    0x2C, 0x02, 0x20,   # 0x803C: BIT $2002
+    0x50, 0xFB,         # BVC $803C
+    0xE6, 0x00,         # INC $00
+    0x4C, 0x30, 0x80,   # JMP $8030
+])
+POLLING_HIT_LINE = 0x30
+
+def make_polling_rom(path):
+    prog = bytearray(0x4000)
+    prog[:len(POLLING_PROG)] = POLLING_PROG
+    prog[0x3FFA:] = bytes([0x00, 0x80]) * 3
+    char = bytearray(0x2000)
+    char[0x10:0x20] = bytes([0xFF]) * 0x10
+    path.write_bytes(NES_MAGIC + bytes([1, 1]) + bytes(10) + prog + char)
+    return Nes(path)
+
+# (counter, frame, line, cycle, op index) at every exit of a polling loop
+def run_polling(nes, frames):
+    cpu, wram = nes.cpu, nes.wram.data
+    exits = []
+    counts = wram[0:2]
+    while nes.ppu.frame < frames:
+        cpu.run()
+        if wram[0:2] != counts:
+            counts = wram[0:2]
+            cpu.sync_ppu()
+            exits.append((counts[0], nes.ppu.frame, nes.ppu.line,
+                cpu.cycle, cpu.op_index))
+    return exits
+
+def test_idle_skip_polling(tmp_path):
+    nes = make_polling_rom(tmp_path / "a.nes")
+    nes_ = make_polling_rom(tmp_path / "a.nes")
+    nes.cpu.idle_skip = False
+    exits = run_polling(nes, 5)
+    assert run_polling(nes_, 5) == exits
+    assert nes_.cpu.cycle == nes.cpu.cycle
+    assert nes_.cpu.op_index == nes.cpu.op_index
+
+def test_sprite_hit_polling(tmp_path):
+    nes = make_polling_rom(tmp_path / "a.nes")
+    assert nes.cpu.idle_skip
+    exits = run_polling(nes, 5)
+    # exits of the sprite 0 loop increment the counter
+    hits = [e for prev, e in zip([(0,)] + exits, exits) if e[0] != prev[0]]
+    assert [frame for _, frame, *_ in hits] == [1, 2, 3, 4]
+    # the loop exits right after the hit, on the same line
+    assert all(line == POLLING_HIT_LINE for _, _, line, *_ in hits)
@@ -0,0 +1,14 @@
+import pytest
+from pynes.genopset import *
+from pynes.opset import *
+
+def test_opset_is_compiled():
+    # regenerate by `python -m pynes.genopset` when opset.yaml changes
+    table = load_opset()
+    assert OPSET == table
+    assert OPSET_PY.read_text() == render(table)
+
+def test_opset_size():
+    assert OPSET[0xA9] == ("LDA", "IMD", 2, 2)
+    assert OPSET[0x4C] == ("JMP", "ABS", 3, 3)
+    assert OPSET[0x0B] is None
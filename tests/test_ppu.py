@@ -0,0 +1,167 @@
+import pytest
+from pynes.cassette import *
+from pynes.ppu import *
+from pynes.interrupts import *
+from pynes.renderer import *
+
+@pytest.fixture
+def hello_ppu():
+    cas = Cassette("rom/hello.nes")
+    vram = Ram(VRAM_SIZE)
+    inter = Interrupts()
+    return Ppu(cas, vram, inter)
+
+def test_decode_tiles():
+    # example of Ppu.build_sprite_data
+    data = bytes([0x41, 0xC2, 0x44, 0x48, 0x10, 0x20, 0x40, 0x80,
+        0x01, 0x02, 0x04, 0x08, 0x16, 0x21, 0x42, 0x87])
+    pattern = [
+        ".1.....3",
+        "11....3.",
+        ".1...3..",
+        ".1..3...",
+        "...3.22.",
+        "..3....2",
+        ".3....2.",
+        "3....222",
+    ]
+    tiles = decode_tiles(data)
+    assert tiles.shape == (1, 8, 8)
+    assert ["".join(str(p) if p else "." for p in row)
+        for row in tiles[0]] == pattern
+
+# pattern table write through PPUADDR/PPUDATA
+def write_tile(ppu, tile_id):
+    ppu.write(0x0006, tile_id >> 4)
+    ppu.write(0x0006, (tile_id << 4) & 0xFF)
+    for _ in range(16):
+        ppu.write(0x0007, 0xFF)
+
+def test_tile_cache(hello_ppu):
+    ppu = hello_ppu
+    assert ppu.char_ram is None
+    assert ppu.tiles.shape == (ppu.cas.char_size // 16, 8, 8)
+    # "H"
+    tile = ppu.build_sprite_data(0x48, 0x0000).copy()
+    assert tile.any()
+    # char rom is read only
+    write_tile(ppu, 0x48)
+    assert (ppu.build_sprite_data(0x48, 0x0000) == tile).all()
+
+def test_char_ram(tmp_path):
+    path = tmp_path / "char_ram.nes"
+    path.write_bytes(NES_MAGIC + bytes([1, 0]) + bytes(10) +
+        bytes(PROG_ROM_UNIT_SIZE))
+    ppu = Ppu(Cassette(path), Ram(VRAM_SIZE), Interrupts())
+    assert ppu.tiles.shape == (CHAR_RAM_SIZE // 16, 8, 8)
+    write_tile(ppu, 0x48)
+    assert (ppu.build_sprite_data(0x48, 0x0000) == 3).all()
+    assert not ppu.build_sprite_data(0x49, 0x0000).any()
+    assert ppu.char_ram.data[0x480:0x490] == bytes([0xFF] * 16)
+
+def test_catch_up(hello_ppu):
+    ppu = hello_ppu
+    # vblank at the start of line 241
+    cycle = ppu.get_next_event()
+    assert cycle == -(-(V_SIZE + 1) * CYCLE_PER_LINE // 3)
+    assert ppu.run(cycle - 1) is None
+    assert not ppu.get_is_vblank()
+    ppu.run(1)
+    assert ppu.line == V_SIZE + 1
+    assert ppu.get_is_vblank()
+    assert ppu.background.rows == V_SPRITE_NUM
+
+    # then the end of frame
+    image = ppu.run(ppu.get_next_event())
+    assert image is not None
+    assert ppu.frame == 1
+    assert ppu.line == 0
+
+def set_oam(ppu, sprites):
+    oam = bytearray([0xFF]) * SPRITE_RAM_SIZE
+    for i, sprite in enumerate(sprites):
+        oam[i * 4:i * 4 + 4] = sprite
+    ppu.write_sprite_ram_dma(oam)
+
+def test_evaluate_sprites(hello_ppu):
+    ppu = hello_ppu
+    ppu.creg2 = 0x18
+    # (y, tile, attr, x), "H" flipped, then 9 sprites on line 50
+    set_oam(ppu, [(10, 0x48, 0xC1, 20)] +
+        [(50 - i // 2, 0x49, 0x00, i * 8) for i in range(9)])
+    tile = ppu.build_sprite_data(0x48, 0x0000)
+    for line in range(V_SIZE):
+        ppu.evaluate_sprites(line)
+    sprites = ppu.sprites
+    assert sprites.count[9] == 0
+    assert sprites.count[10] == sprites.count[17] == 1
+    assert sprites.x[10, 0] == 20 and sprites.attr[10, 0] == 0xC1
+    assert (sprites.data[10, 0] == tile[7, ::-1]).all()
+    assert (sprites.data[17, 0] == tile[0, ::-1]).all()
+
+    # up to 8 sprites in OAM order
+    assert sprites.count[50] == SPRITES_PER_LINE
+    assert sprites.index[50].tolist() == list(range(1, 9))
+    assert ppu.sreg & 0x20
+    assert ppu.overflow_line == 50
+
+def test_evaluate_sprites_8x16(hello_ppu):
+    ppu = hello_ppu
+    ppu.creg1 = 0x20
+    ppu.creg2 = 0x18
+    # odd tile: pattern table 0x1000
+    set_oam(ppu, [(10, 0x49, 0x00, 0), (30, 0x48, 0x80, 0)])
+    for line in range(V_SIZE):
+        ppu.evaluate_sprites(line)
+    sprites = ppu.sprites
+    assert sprites.count[25] == 1 and sprites.count[26] == 0
+    assert (sprites.data[10, 0] == ppu.tiles[0x148][0]).all()
+    assert (sprites.data[18, 0] == ppu.tiles[0x149][0]).all()
+    # vertical reverse of both tiles
+    assert (sprites.data[30, 0] == ppu.tiles[0x49][7]).all()
+    assert (sprites.data[45, 0] == ppu.tiles[0x48][0]).all()
+    assert not ppu.sreg & 0x20
+
+def test_sprite_hit(hello_ppu):
+    ppu = hello_ppu
+    # "H" on the background at tile (5, 3), scrolled by (3, 5)
+    ppu.vram.data[3 * H_SPRITE_NUM + 5] = 0x48
+    ppu.write(0x0005, 3)
+    ppu.write(0x0005, 5)
+    ppu.write(0x0001, 0x1E)
+    # flipped "H" over its right end
+    set_oam(ppu, [(22, 0x48, 0x40, 41)])
+    # left end of the sprite over the bar of the background "H"
+    line, cycle = ppu.get_sprite_hit()
+    assert (line, cycle) == (22, 42)
+
+    # the background as rendered
+    ppu.run(V_SIZE_WITH_VBLANK * CYCLE_PER_LINE)
+    renderer = Renderer()
+    renderer.render(ppu.image)
+    background = renderer.background[22:30, 41:49] > 0
+    sprite = ppu.tiles[0x48][:, ::-1] > 0
+    row, col = np.argwhere(background & sprite)[0]
+    assert (line, cycle) == (22 + row, 41 + col + 1)
+
+    # the flag is set at the cycle, the next event
+    ppu.run(-(-(line * CYCLE_PER_LINE - ppu.cycle) // 3))
+    assert ppu.line == line and not ppu.sreg & 0x40
+    event = ppu.get_next_event()
+    assert event == -(-(cycle - ppu.cycle) // 3)
+    ppu.run(event - 1)
+    assert not ppu.sreg & 0x40
+    ppu.run(1)
+    assert ppu.sreg & 0x40
+
+def test_sprite_hit_clip(hello_ppu):
+    ppu = hello_ppu
+    ppu.vram.data[0] = 0x48
+    set_oam(ppu, [(0, 0x48, 0x00, 0)])
+    ppu.write(0x0001, 0x18)
+    assert ppu.get_sprite_hit() == NO_SPRITE_HIT
+    ppu.write(0x0001, 0x1E)
+    assert ppu.get_sprite_hit() == (0, 1)
+    # sprites behind the background hit as well
+    set_oam(ppu, [(0, 0x48, 0x20, 0)])
+    assert ppu.get_sprite_hit() == (0, 1)
@@ -0,0 +1,99 @@
+import pytest
+from pynes.ppu import *
+from pynes.renderer import *
+
+@pytest.fixture
+def image():
+    # tile 1: upper half opaque
+    tiles = np.zeros((4, 8, 8), dtype=np.uint8)
+    tiles[1, :4, :] = 1
+    background = Background()
+    background.rows = V_SPRITE_NUM
+    # tile (1, 1) with palette 1
+    background.tile_id[1, 1] = 1
+    background.palette_id[1, 1] = 1
+    palette = np.arange(PALETTE_SIZE, dtype=np.uint8)
+    return {"background": background, "tiles": tiles,
+        "sprites": SpriteLines(), "palette": palette}
+
+# 8x8 sprite in the next free slot of its lines, left column: 1,
+# right column: 2
+def add_sprite(sprites, x, y, attr):
+    for line in range(y, y + 8):
+        slot = sprites.count[line]
+        sprites.count[line] += 1
+        sprites.x[line, slot] = x
+        sprites.attr[line, slot] = attr
+        sprites.data[line, slot] = [1, 0, 0, 0, 0, 0, 0, 2]
+
+def test_render_background(image):
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert data.shape == (V_SIZE, H_SIZE)
+    assert (data[8:12, 8:16] == COLORS[5]).all()
+    assert (data[12:16, 8:16] == COLORS[4]).all()
+    assert (data[:8, :] == COLORS[0]).all()
+
+def test_render_background_scroll(image):
+    # split screen, scroll only below line 12
+    background = image["background"]
+    background.scroll[12:, 0] = 4
+    # next name table
+    background.tile_id[1, 32] = 1
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[8:12, 8:16] == COLORS[5]).all()
+    assert (data[12:16, 4:12] == COLORS[4]).all()
+    assert (data[12:16, 12:16] == COLORS[0]).all()
+    assert (data[12:16, 252:256] == COLORS[0]).all()
+
+    # wrap around to the other name table
+    background.scroll[:, 0] = 260
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[8:12, 0:4] == COLORS[1]).all()
+    assert (data[8:12, 4:8] == COLORS[0]).all()
+
+@pytest.mark.parametrize(("attr", "left", "right"), [
+    (0x00, 0x11, 0x12),
+    (0x01, 0x15, 0x16),
+])
+def test_render_sprite(image, attr, left, right):
+    add_sprite(image["sprites"], 40, 40, attr)
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[40:48, 40] == COLORS[left]).all()
+    assert (data[40:48, 47] == COLORS[right]).all()
+    # transparent
+    assert (data[40:48, 41:47] == COLORS[0]).all()
+
+def test_render_sprite_priority(image):
+    # behind the background, visible only on transparent pixels
+    add_sprite(image["sprites"], 8, 8, 0x20)
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[8:12, 8] == COLORS[5]).all()
+    assert (data[12:16, 8] == COLORS[0x11]).all()
+
+def test_render_sprite_order(image):
+    # the lower OAM index is in front
+    add_sprite(image["sprites"], 40, 40, 0x01)
+    add_sprite(image["sprites"], 33, 40, 0x00)
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[40:48, 40] == COLORS[0x15]).all()
+    assert (data[40:48, 33] == COLORS[0x11]).all()
+
+def test_render_sprite_clip(image):
+    add_sprite(image["sprites"], 252, 40, 0x00)
+    renderer = Renderer()
+    renderer.render(image)
+    data = renderer.get_render_result()
+    assert (data[40:48, 252] == COLORS[0x11]).all()
+    # not wrapped around
+    assert (data[40:48, 3] == COLORS[0]).all()
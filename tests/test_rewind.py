@@ -0,0 +1,43 @@
+import pytest
+from pynes.nes import *
+from pynes.rewind import *
+
+def run(rewind, frames, states):
+    pad = rewind.nes.cpu.pad1
+    for _ in range(frames):
+        frame = rewind.nes.ppu.frame
+        pad.set_buttons((frame * 37) & 0xFF)
+        states[frame] = (rewind.nes.save_state(), pad.get_buttons())
+        rewind.run_frame()
+
+def test_rewind():
+    nes = Nes("rom/nestest.nes")
+    rewind = Rewind(nes, interval = 4, keyframe_interval = 3)
+    states = {}
+    run(rewind, 30, states)
+    assert [k.frame for k in rewind.keyframes] == [0, 12, 24]
+    assert [f for f, _ in rewind.keyframes[1].deltas] == [16, 20]
+
+    for frame in [29, 17, 12, 3]:
+        rewind.restore(frame)
+        assert nes.ppu.frame == frame
+        assert nes.save_state() == states[frame][0]
+        assert nes.cpu.pad1.get_buttons() == states[frame][1]
+    assert [k.frame for k in rewind.keyframes] == [0]
+    assert rewind.keyframes[0].deltas == []
+
+    # record again after rewinding
+    run(rewind, 10, states)
+    rewind.restore(9)
+    assert nes.save_state() == states[9][0]
+
+def test_rewind_size():
+    nes = Nes("rom/hello.nes")
+    rewind = Rewind(nes, size = 1, interval = 2, keyframe_interval = 2)
+    run(rewind, 10, {})
+    # only the latest keyframe is kept
+    assert len(rewind.keyframes) == 1
+    assert rewind.get_oldest_frame() == 8
+    assert min(rewind.pads) == 8
+    with pytest.raises(AssertionError):
+        rewind.restore(7)
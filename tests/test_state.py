@@ -0,0 +1,37 @@
+import pytest
+from pynes.nes import *
+
+def get_machine(nes):
+    return (nes.cpu.cycle, nes.cpu.op_index, vars(nes.cpu.reg).copy(),
+        bytes(nes.wram.data), bytes(nes.vram.data), nes.ppu.line,
+        nes.ppu.cycle, nes.ppu.sreg)
+
+@pytest.mark.parametrize("rom", ["rom/hello.nes", "rom/nestest.nes"])
+def test_save_load(rom):
+    nes = Nes(rom)
+    nes.run_frame()
+    for _ in range(100):
+        nes.cpu.run()
+    state = nes.save_state()
+    assert state[:4] == STATE_MAGIC
+    saved = get_machine(nes)
+
+    nes.run_frame()
+    frame = nes.save_state()
+    expected = get_machine(nes)
+
+    # restore into the same machine and a fresh one
+    for nes_ in [nes, Nes(rom)]:
+        nes_.load_state(state)
+        assert get_machine(nes_) == saved
+        nes_.run_frame()
+        assert get_machine(nes_) == expected
+        assert nes_.save_state() == frame
+
+def test_invalid_state():
+    nes = Nes("rom/hello.nes")
+    state = nes.save_state()
+    with pytest.raises(AssertionError):
+        nes.load_state(state[:-1])
+    with pytest.raises(AssertionError):
+        nes.load_state(b"XXXX" + state[4:])
@@ -0,0 +1,49 @@
+import pytest
+from pynes.video import *
+
+@pytest.fixture
+def dummy_display(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    yield
+    pygame.quit()
+
+@pytest.mark.parametrize("scale", [1, 2, 3])
+def test_video_update(dummy_display, scale):
+    video = Video(None, scale)
+    data = np.zeros((V_SIZE, H_SIZE), dtype=np.uint32)
+    data[10, 20] = 0x0077FF
+    data[V_SIZE - 1, H_SIZE - 1] = 0xFFFFFF
+    video.update(data)
+
+    assert video.surface.get_size() == (H_SIZE * scale, V_SIZE * scale)
+    def color(x, y):
+        return tuple(video.surface.get_at((x * scale, y * scale)))[:3]
+    assert color(20, 10) == (0x00, 0x77, 0xFF)
+    assert color(H_SIZE - 1, V_SIZE - 1) == (0xFF, 0xFF, 0xFF)
+    assert color(0, 0) == (0x00, 0x00, 0x00)
+
+def frame():
+    data = np.zeros((V_SIZE, H_SIZE), dtype=np.uint32)
+    data[10, 20] = 0x0077FF
+    return data
+
+def test_headless_video():
+    video = create_video("headless", None)
+    video.update(frame())
+    video.close()
+    assert video.count == 1
+
+def test_file_video_raw(tmp_path):
+    video = create_video("raw", None, path = tmp_path)
+    video.update(frame())
+    video.update(frame())
+    video.close()
+    raw = np.fromfile(tmp_path / "frames.raw", dtype="<u4")
+    assert (raw.reshape(2, V_SIZE, H_SIZE) == frame()).all()
+
+def test_file_video_png(tmp_path):
+    video = create_video("png", None, path = tmp_path)
+    video.update(frame())
+    video.close()
+    image = pygame.image.load(str(tmp_path / "frame_000000.png"))
+    assert tuple(image.get_at((20, 10)))[:3] == (0x00, 0x77, 0xFF)